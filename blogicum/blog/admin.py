@@ -1,10 +1,193 @@
-from django.contrib import admin
+import logging
+from hashlib import md5
 
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.exceptions import EmptyResultSet
+from django.db import OperationalError
+from django.template.response import TemplateResponse
+
+from blog.cache import changelist_scope
+from blog.export import stream_export
 from blog.models import Post, Category, Location, Comment
+from blog.moderation import delete_in_batches, set_published
+from blog.paginators import CachedCountPaginator
+from blog.search import find_matching_ids, search_by_prefix
+
+logger = logging.getLogger('blog.admin')
+
+
+class IndexedSearchMixin:
+    """Search the changelist through the full-text index of the model.
+
+    Every word of the search matches as a prefix of a word in the
+    indexed columns. At most BLOG_ADMIN_SEARCH_LIMIT newest matches found
+    within BLOG_ADMIN_SEARCH_BUDGET seconds are shown. Without the index
+    the LIKE search over ``search_fields`` is used.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        try:
+            found = find_matching_ids(
+                self.model, search_term,
+                settings.BLOG_ADMIN_SEARCH_LIMIT,
+                settings.BLOG_ADMIN_SEARCH_BUDGET
+            )
+        except OperationalError as error:
+            logger.warning('%s search index: %s', self.model.__name__, error)
+            found = None
+        if found is None:
+            return super().get_search_results(request, queryset, search_term)
+        ids, complete = found
+        match = request.resolver_match
+        if not complete and getattr(match, 'url_name', '') != 'autocomplete':
+            # Autocomplete widgets do not show messages.
+            self.message_user(
+                request,
+                'Показаны не все совпадения, уточните запрос.',
+                messages.WARNING
+            )
+        return queryset.filter(pk__in=ids), False
+
+
+class CachedCountMixin:
+    """Cache changelist counts until a row of the model changes.
+
+    Counts are kept per filtered query in the changelist scope of the
+    model, bumped by blog.signals; the unfiltered total is not counted.
+    """
+
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            sql, params = '', ()
+        return CachedCountPaginator(
+            queryset, per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            scopes=(changelist_scope(self.model._meta.model_name),),
+            key=md5(f'{sql}{params}'.encode()).hexdigest()
+        )
+
+
+class ModerationMixin:
+    """Publish, unpublish and delete selected rows in batches.
+
+    Every batch is a few set-based queries; feeds, counters and caches
+    are updated once per batch instead of once per row. The delete
+    action replaces the stock one: its confirmation page shows only the
+    number of rows, and deletions are logged with one insert per batch.
+    """
+
+    actions = ('publish', 'unpublish', 'delete_selected')
+
+    @admin.action(
+        description='Опубликовать выбранные', permissions=('change',)
+    )
+    def publish(self, request, queryset):
+        count = set_published(queryset, True)
+        self.message_user(request, f'Опубликовано: {count}.')
+
+    @admin.action(
+        description='Снять с публикации', permissions=('change',)
+    )
+    def unpublish(self, request, queryset):
+        count = set_published(queryset, False)
+        self.message_user(request, f'Снято с публикации: {count}.')
+
+    @admin.action(
+        description='Удалить выбранные', permissions=('delete',)
+    )
+    def delete_selected(self, request, queryset):
+        if request.POST.get('post'):
+            count = delete_in_batches(queryset, request.user.pk)
+            self.message_user(request, f'Удалено: {count}.')
+            return None
+        request.current_app = self.admin_site.name
+        return TemplateResponse(
+            request, 'admin/blog/delete_in_batches_confirmation.html', {
+                **self.admin_site.each_context(request),
+                'title': 'Вы уверены?',
+                'opts': self.opts,
+                'count': queryset.count(),
+                'select_across': request.POST.get('select_across', '0'),
+                'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+                'action_checkbox_name': ACTION_CHECKBOX_NAME,
+                'media': self.media,
+            }
+        )
+
+
+class ExportMixin:
+    """Stream selected rows, or all filtered ones, as CSV or JSONL."""
+
+    @admin.action(description='Выгрузить в CSV', permissions=('view',))
+    def export_csv(self, request, queryset):
+        return stream_export(queryset, 'csv')
+
+    @admin.action(description='Выгрузить в JSONL', permissions=('view',))
+    def export_jsonl(self, request, queryset):
+        return stream_export(queryset, 'jsonl')
+
+
+class RelatedSearchListFilter(admin.RelatedFieldListFilter):
+    """Related filter offering only rows matching the typed words.
+
+    Instead of listing every related row the sidebar shows a search box;
+    up to BLOG_AUTOCOMPLETE_LIMIT rows whose first ``search_fields`` column
+    of the related admin starts with its words are offered, found by
+    blog.search.search_by_prefix(), plus the chosen row.
+    """
+
+    template = 'admin/blog/related_search_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin,
+                 field_path):
+        self.search_kwarg = f'{field_path}__q'
+        self.search_term = params.pop(self.search_kwarg, '')
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+
+    def has_output(self):
+        return True
+
+    def field_choices(self, field, request, model_admin):
+        related = field.related_model._default_manager.all()
+        chosen = related.filter(pk=self.lookup_val) if (
+            self.lookup_val and self.lookup_val.isdigit()
+        ) else related.none()
+        found = related.none()
+        if self.search_term.strip():
+            related_admin = model_admin.admin_site._registry[
+                field.related_model
+            ]
+            found = search_by_prefix(
+                related, self.search_term, related_admin.search_fields[0],
+                settings.BLOG_AUTOCOMPLETE_LIMIT
+            )
+        choices = {obj.pk: str(obj) for obj in chosen}
+        for obj in found:
+            choices.setdefault(obj.pk, str(obj))
+        return list(choices.items())
+
+    def choices(self, changelist):
+        self.hidden_params = [
+            (name, value) for name, value in changelist.params.items()
+            if name not in (self.search_kwarg, PAGE_VAR)
+        ]
+        yield from super().choices(changelist)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ModerationMixin, ExportMixin, CachedCountMixin,
+                IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'short_text',
@@ -16,9 +199,21 @@ class PostAdmin(admin.ModelAdmin):
         'created_at'
     )
     list_editable = ('is_published',)
+    list_select_related = ('author', 'category', 'location')
+    autocomplete_fields = ('category', 'location')
+    raw_id_fields = ('author',)
     search_fields = ('title', 'text')
-    list_filter = ('is_published', 'pub_date', 'category', 'location')
+    list_filter = (
+        'is_published',
+        'pub_date',
+        ('category', RelatedSearchListFilter),
+        ('location', RelatedSearchListFilter)
+    )
     list_display_links = ('title',)
+    actions = (
+        'publish', 'unpublish', 'delete_selected', 'export_csv',
+        'export_jsonl'
+    )
     ordering = ('-pub_date', 'author')
     list_per_page = 10
 
@@ -28,7 +223,7 @@ class PostAdmin(admin.ModelAdmin):
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(ModerationMixin, IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'description',
@@ -43,7 +238,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(ModerationMixin, IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'name',
         'is_published',
@@ -56,7 +251,8 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ModerationMixin, ExportMixin, CachedCountMixin,
+                   IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'short_text',
         'author',
@@ -64,6 +260,12 @@ class CommentAdmin(admin.ModelAdmin):
         'post',
     )
     list_display_links = ('short_text',)
+    actions = (
+        'publish', 'unpublish', 'delete_selected', 'export_csv',
+        'export_jsonl'
+    )
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('author', 'post')
     search_fields = ('text',)
     list_filter = ('created_at',)
 
@@ -5,3 +5,10 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.core import checks
+
+        from blog import signals  # noqa: F401
+        from blog.cache import check_shared_cache
+        checks.register(check_shared_cache, checks.Tags.caches)
@@ -0,0 +1,187 @@
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from blog.routers import reading_from_primary
+
+GENERATION_KEY = 'blog:generation:{}'
+BUMPED_KEY = 'blog:bumped:{}'
+INDEX_SCOPE = 'index'
+POST_SCOPE_FIELDS = (
+    'pk',
+    'is_visible',
+    'author__username',
+    'category__slug'
+)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when cache generations cannot reach other worker processes."""
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return []
+    return [checks.Warning(
+        'The default cache is local to each process: cache invalidation '
+        'of one worker does not reach the others.',
+        hint='Use a file, Memcached or Redis cache when running several '
+             'worker processes.',
+        id='blog.W001',
+    )]
+
+
+def category_scope(slug: str) -> str:
+    return f'category:{slug}'
+
+
+def author_scope(username: str) -> str:
+    return f'author:{username}'
+
+
+def post_scope(pk: int) -> str:
+    return f'post:{pk}'
+
+
+def object_scope(model_name: str, pk: int) -> str:
+    return f'{model_name}:{pk}:card'
+
+
+def changelist_scope(model_name: str) -> str:
+    return f'{model_name}:changelist'
+
+
+def get_generations(scopes) -> tuple:
+    """Return current generation of every scope.
+
+    A scope seen for the first time (or evicted from the cache) starts
+    from the current time, so it never reuses entries of a previous life.
+    """
+    keys = [GENERATION_KEY.format(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return tuple(generations[key] for key in keys)
+
+
+def bump(*scopes):
+    """Invalidate everything cached for the scopes.
+
+    With read replicas the scopes are also marked as changed for
+    BLOG_REPLICA_STICKY seconds, see was_bumped_recently().
+    """
+    for scope in set(scopes):
+        key = GENERATION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    if settings.BLOG_READ_REPLICAS:
+        cache.set_many(
+            {BUMPED_KEY.format(scope): True for scope in scopes},
+            settings.BLOG_REPLICA_STICKY
+        )
+
+
+def was_bumped_recently(scopes) -> bool:
+    """Check if any scope was bumped within BLOG_REPLICA_STICKY seconds.
+
+    Replicas may still lag behind such a change, and a value built from
+    them would be cached under the new generation.
+    """
+    if not settings.BLOG_READ_REPLICAS:
+        return False
+    return bool(cache.get_many(
+        [BUMPED_KEY.format(scope) for scope in scopes]
+    ))
+
+
+def bump_on_commit(*scopes):
+    """Invalidate scopes now and once more after the commit.
+
+    The second bump drops pages cached by concurrent readers that still
+    saw the data before the transaction was committed.
+    """
+    bump(*scopes)
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def attach_card_keys(posts):
+    """Set ``card_key`` to versions of everything shown in a post card."""
+    card_scopes = {
+        post.pk: (
+            post_scope(post.pk),
+            object_scope('category', post.category_id),
+            object_scope('location', post.location_id),
+            object_scope('user', post.author_id),
+        )
+        for post in posts
+    }
+    scopes = list({
+        scope for post_scopes in card_scopes.values()
+        for scope in post_scopes
+    })
+    generations = dict(zip(scopes, get_generations(scopes)))
+    for post in posts:
+        post.card_key = '.'.join(
+            [str(post.pk), *(
+                str(generations[scope]) for scope in card_scopes[post.pk]
+            )]
+        )
+
+
+def make_key(prefix: str, scopes, *parts) -> str:
+    """Return cache key valid until any of the scopes is bumped."""
+    generations = get_generations(scopes)
+    return ':'.join(
+        ['blog', prefix, *map(str, parts), *map(str, generations)]
+    )
+
+
+def get_or_build(prefix: str, scopes, parts, build):
+    """Return cached value for the scopes or build and cache it.
+
+    Values of scopes bumped within BLOG_REPLICA_STICKY seconds are built
+    from the primary, the rest from a replica.
+    """
+    key = make_key(prefix, scopes, *parts)
+    value = cache.get(key)
+    if value is None:
+        changed = was_bumped_recently(scopes)
+        with reading_from_primary() if changed else nullcontext():
+            value = build()
+        cache.set(key, value, settings.BLOG_CACHE_TIMEOUT)
+    return value
+
+
+def get_feed_scopes(posts) -> set:
+    """Return cache scopes of the feeds listing the posts."""
+    scopes = set()
+    for post in posts.values(*POST_SCOPE_FIELDS):
+        scopes |= {
+            post_scope(post['pk']),
+            author_scope(post['author__username'])
+        }
+        if post['category__slug']:
+            scopes.add(category_scope(post['category__slug']))
+        if post['is_visible']:
+            scopes.add(INDEX_SCOPE)
+    return scopes
+
+
+def get_related_feed_scopes(posts) -> set:
+    """Return scopes of the feeds showing related object in post cards."""
+    scopes = set()
+    for username, slug, is_listed in posts.values_list(
+        'author__username', 'category__slug', 'is_published'
+    ).distinct():
+        scopes.add(author_scope(username))
+        if slug:
+            scopes.add(category_scope(slug))
+        if is_listed:
+            scopes.add(INDEX_SCOPE)
+    return scopes
@@ -0,0 +1,114 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from blog.models import Category, Post, PostCounter
+
+INDEX_KEY = (PostCounter.INDEX, 0)
+
+
+def get_counter_keys(posts) -> set:
+    """Return keys of the counters that include the posts."""
+    keys = set()
+    for category_id, author_id in posts.values_list(
+        'category_id', 'author_id'
+    ).distinct():
+        keys |= {
+            (PostCounter.AUTHOR, author_id),
+            (PostCounter.AUTHOR_ALL, author_id)
+        }
+        if category_id:
+            keys |= {(PostCounter.CATEGORY, category_id), INDEX_KEY}
+    return keys
+
+
+def count_posts(kind: str, object_ids) -> dict:
+    """Count posts of counters of one kind with an aggregate query."""
+    field = 'category_id' if kind == PostCounter.CATEGORY else 'author_id'
+    posts = Post.objects.filter(**{f'{field}__in': object_ids})
+    if kind != PostCounter.AUTHOR_ALL:
+        posts = posts.filter(is_visible=True, pub_date__lte=timezone.now())
+    counts = dict(
+        posts.order_by().values_list(field).annotate(count=Count('pk'))
+    )
+    return {object_id: counts.get(object_id, 0) for object_id in object_ids}
+
+
+def store_counts(counts: dict):
+    """Save counts by counter keys, creating missing counters."""
+    if not counts:
+        return
+    stored = {
+        (counter.kind, counter.object_id): counter
+        for counter in PostCounter.objects.filter(reduce(or_, (
+            Q(kind=kind, object_id=object_id) for kind, object_id in counts
+        )))
+    }
+    changed = []
+    for key, posts_count in counts.items():
+        counter = stored.get(key)
+        if counter is not None and counter.posts_count != posts_count:
+            counter.posts_count = posts_count
+            changed.append(counter)
+    PostCounter.objects.bulk_update(changed, ('posts_count',))
+    PostCounter.objects.bulk_create(
+        [
+            PostCounter(kind=kind, object_id=object_id, posts_count=count)
+            for (kind, object_id), count in counts.items()
+            if (kind, object_id) not in stored
+        ],
+        ignore_conflicts=True
+    )
+
+
+def count_index() -> int:
+    """Count visible posts as a sum of all category counters."""
+    missing = list(Category.objects.exclude(pk__in=PostCounter.objects.filter(
+        kind=PostCounter.CATEGORY
+    ).values('object_id')).values_list('pk', flat=True))
+    if missing:
+        store_counts({
+            (PostCounter.CATEGORY, pk): count
+            for pk, count in count_posts(PostCounter.CATEGORY, missing).items()
+        })
+    return PostCounter.objects.filter(
+        kind=PostCounter.CATEGORY
+    ).aggregate(total=Sum('posts_count'))['total'] or 0
+
+
+def recount(keys):
+    """Recount the counters in one transaction.
+
+    Counters of one kind are counted by a single grouped query. The index
+    counter is a sum of category counters, so it is recounted after any
+    of them.
+    """
+    keys = set(keys)
+    if any(kind == PostCounter.CATEGORY for kind, _ in keys):
+        keys.add(INDEX_KEY)
+    object_ids = defaultdict(list)
+    for kind, object_id in keys - {INDEX_KEY}:
+        object_ids[kind].append(object_id)
+    with transaction.atomic():
+        store_counts({
+            (kind, object_id): count
+            for kind, ids in object_ids.items()
+            for object_id, count in count_posts(kind, ids).items()
+        })
+        if INDEX_KEY in keys:
+            store_counts({INDEX_KEY: count_index()})
+
+
+def get_posts_count(kind: str, object_id: int = 0) -> int:
+    """Return stored count, creating the counter on first use."""
+    posts_count = PostCounter.objects.filter(
+        kind=kind, object_id=object_id
+    ).values_list('posts_count', flat=True).first()
+    if posts_count is None:
+        recount({(kind, object_id)})
+        return get_posts_count(kind, object_id)
+    return posts_count
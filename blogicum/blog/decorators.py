@@ -0,0 +1,47 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from blog.cache import make_key, was_bumped_recently
+from blog.routers import pin_to_primary
+from blog.visibility import visibility_now
+
+
+def cache_anonymous_page(get_scopes):
+    """Cache whole response for anonymous visitors until scopes change.
+
+    ``get_scopes`` receives URL kwargs of the view and returns scopes of
+    the content shown on the page.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            # Runs the publication schedule, so delayed posts invalidate
+            # pages even when nothing below reaches get_posts().
+            visibility_now()
+            scopes = get_scopes(**kwargs)
+            key = make_key('response', scopes, request.get_full_path())
+            response = cache.get(key)
+            if response is not None:
+                return response
+            if was_bumped_recently(scopes):
+                # The page is rendered after the view returns, so the rest
+                # of the request reads from the primary, see get_or_build.
+                pin_to_primary()
+            response = view(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            if response.status_code == 200:
+                def store(rendered):
+                    cache.set(key, rendered, settings.BLOG_CACHE_TIMEOUT)
+                if getattr(response, 'is_rendered', True):
+                    store(response)
+                else:
+                    response.add_post_render_callback(store)
+            return response
+        return wrapper
+    return decorator
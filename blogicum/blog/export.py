@@ -0,0 +1,66 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from blog.models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = {
+    Post: (
+        'id', 'title', 'text', 'pub_date', 'author__username',
+        'category__slug', 'location__name', 'is_published',
+        'comment_count', 'created_at'
+    ),
+    Comment: (
+        'id', 'post_id', 'author__username', 'text', 'is_published',
+        'created_at'
+    ),
+}
+
+
+class Echo:
+    """File-like object returning written lines to the csv writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset):
+    """Yield export fields of the rows fetched by EXPORT_CHUNK_SIZE."""
+    return queryset.values_list(
+        *EXPORT_FIELDS[queryset.model]
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def iter_csv(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS[queryset.model])
+    for row in iter_rows(queryset):
+        yield writer.writerow(row)
+
+
+def iter_jsonl(queryset):
+    fields = EXPORT_FIELDS[queryset.model]
+    for row in iter_rows(queryset):
+        yield json.dumps(
+            dict(zip(fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (iter_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
+
+
+def stream_export(queryset, export_format: str) -> StreamingHttpResponse:
+    """Return response streaming the rows, one chunk of rows in memory."""
+    iter_lines, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        iter_lines(queryset), content_type=content_type
+    )
+    filename = f'{queryset.model._meta.model_name}s.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -1,8 +1,46 @@
 from django import forms
+from django.urls import reverse_lazy
 
 from blog.models import User, Post, Comment
 
 
+class AutocompleteSelect(forms.Select):
+    """Select of a foreign key rendering only the chosen option.
+
+    Other options are fetched from ``url`` as the user types, so the page
+    does not load the whole related table.
+    """
+
+    class Media:
+        js = ('js/autocomplete.js',)
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = self.url
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        choices = []
+        if field.empty_label is not None:
+            choices.append(('', field.empty_label))
+        choices += [
+            (obj.pk, field.label_from_instance(obj))
+            for obj in field.queryset.filter(
+                pk__in=[pk for pk in value if str(pk).isdigit()]
+            )
+        ]
+        all_choices, self.choices = self.choices, choices
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
+
+
 class ProfileEditForm(forms.ModelForm):
 
     class Meta:
@@ -15,6 +53,12 @@ class PostForm(forms.ModelForm):
     class Meta:
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'category': AutocompleteSelect(
+                reverse_lazy('blog:autocomplete', args=['category'])
+            ),
+            'location': AutocompleteSelect(
+                reverse_lazy('blog:autocomplete', args=['location'])
+            ),
         }
         model = Post
         exclude = ('author',)
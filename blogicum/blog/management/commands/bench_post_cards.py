@@ -0,0 +1,37 @@
+from timeit import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+
+from blog.cache import attach_card_keys
+from blog.views import get_posts
+
+
+class Command(BaseCommand):
+    help = 'Compare per-card render time of uncached and cached post cards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, posts, repeat, **options):
+        cards = list(get_posts(published=False)[:posts])
+        if not cards:
+            raise CommandError('Create some posts to render first.')
+        attach_card_keys(cards)
+        body = get_template('includes/post_card_body.html')
+        card = get_template('includes/post_card.html')
+
+        def render(template):
+            for post in cards:
+                template.render({'post': post})
+
+        render(card)
+        before = timeit(lambda: render(body), number=repeat)
+        after = timeit(lambda: render(card), number=repeat)
+        renders = repeat * len(cards)
+        self.stdout.write(
+            f'Uncached: {before / renders * 10 ** 6:.1f} us per card\n'
+            f'Cached:   {after / renders * 10 ** 6:.1f} us per card\n'
+            f'Speed-up: {before / after:.1f}x over {len(cards)} cards'
+        )
@@ -0,0 +1,124 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+DEFAULT_PRAGMAS = {'busy_timeout': 5000, 'journal_mode': 'delete'}
+
+
+def prepare_database(path: Path, rows: int, pragmas: dict):
+    """Create comment-like table and switch it to the journal mode."""
+    with sqlite3.connect(path) as db:
+        db.execute(
+            f'PRAGMA journal_mode = {pragmas.get("journal_mode", "delete")}'
+        )
+        db.execute(
+            'CREATE TABLE comment '
+            '(id INTEGER PRIMARY KEY, post_id INTEGER, text TEXT)'
+        )
+        db.execute('CREATE INDEX comment_post ON comment (post_id)')
+        db.executemany(
+            'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+            ((i % 100, 'x' * 200) for i in range(rows))
+        )
+
+
+def connect(path: Path, pragmas: dict):
+    db = sqlite3.connect(path, isolation_level=None)
+    for name, value in pragmas.items():
+        if name != 'journal_mode':
+            db.execute(f'PRAGMA {name} = {value}')
+    return db
+
+
+def read(db, n):
+    db.execute(
+        'SELECT id, text FROM comment WHERE post_id = ? '
+        'ORDER BY id DESC LIMIT 20', (n % 100,)
+    ).fetchall()
+
+
+def write(db, n):
+    db.execute('BEGIN IMMEDIATE')
+    db.execute(
+        'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+        (n % 100, 'y' * 200)
+    )
+    db.execute('COMMIT')
+
+
+class Worker(threading.Thread):
+    """Repeat the operation on its own connection until the deadline."""
+
+    def __init__(self, operation, path, pragmas, deadline):
+        super().__init__()
+        self.operation = operation
+        self.path = path
+        self.pragmas = pragmas
+        self.deadline = deadline
+        self.done = 0
+        self.locked = 0
+
+    def run(self):
+        db = connect(self.path, self.pragmas)
+        while time.monotonic() < self.deadline:
+            try:
+                self.operation(db, self.done)
+                self.done += 1
+            except sqlite3.OperationalError:
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+                self.locked += 1
+        db.close()
+
+
+def run(path: Path, pragmas: dict, readers: int, writers: int,
+        seconds: float) -> dict:
+    """Run readers and writers in parallel and return their totals."""
+    deadline = time.monotonic() + seconds
+    workers = {
+        operation: [
+            Worker(operation, path, pragmas, deadline) for _ in range(count)
+        ]
+        for operation, count in ((read, readers), (write, writers))
+    }
+    threads = workers[read] + workers[write]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'reads': sum(worker.done for worker in workers[read]),
+        'writes': sum(worker.done for worker in workers[write]),
+        'locked': sum(worker.locked for worker in threads),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Compare parallel read/write throughput of a scratch SQLite '
+            'database with default and BLOG_SQLITE_PRAGMAS settings.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=3)
+        parser.add_argument('--rows', type=int, default=20000)
+
+    def handle(self, *args, readers, writers, seconds, rows, **options):
+        for title, pragmas in (
+            ('Default', DEFAULT_PRAGMAS),
+            ('Tuned', settings.BLOG_SQLITE_PRAGMAS),
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / 'bench.sqlite3'
+                prepare_database(path, rows, pragmas)
+                stats = run(path, pragmas, readers, writers, seconds)
+            self.stdout.write(
+                f'{title}: {stats["reads"] / seconds:.0f} reads/s, '
+                f'{stats["writes"] / seconds:.0f} writes/s, '
+                f'{stats["locked"]} locked'
+            )
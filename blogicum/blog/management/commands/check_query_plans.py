@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.paginators import KeysetPaginator, encode_cursor
+from blog.views import OBJECTS_PER_PAGE, get_posts
+
+CHECKED_TABLES = (Post._meta.db_table, Comment._meta.db_table)
+# Cursor of the keyset queries, distinct from the "now" of the feeds.
+CURSOR_MOMENT = datetime(2000, 1, 1, tzinfo=timezone.utc)
+KEYSET_QUERIES = ('index (keyset)', 'post_detail (comments)')
+SEEK_OPCODES = ('SeekGE', 'SeekGT', 'SeekLE', 'SeekLT')
+
+
+def get_view_queries() -> dict:
+    """Return main queries of the blog views by view name."""
+    return {
+        'index': get_posts()[:OBJECTS_PER_PAGE],
+        'index (keyset)': KeysetPaginator(
+            get_posts(), OBJECTS_PER_PAGE
+        ).get_queryset(after=encode_cursor(CURSOR_MOMENT, 1)),
+        'category_posts': get_posts(
+            Post.objects.filter(category_id=0)
+        )[:OBJECTS_PER_PAGE],
+        'profile': get_posts(
+            Post.objects.filter(author_id=0)
+        )[:OBJECTS_PER_PAGE],
+        'profile (author)': get_posts(
+            Post.objects.filter(author_id=0),
+            published=False
+        )[:OBJECTS_PER_PAGE],
+        'post_detail (comments)': KeysetPaginator(
+            Comment.objects.filter(post_id=0), OBJECTS_PER_PAGE,
+            ordering='created_at'
+        ).get_queryset(after=encode_cursor(CURSOR_MOMENT, 1)),
+    }
+
+
+def explain(queryset) -> list:
+    """Return EXPLAIN QUERY PLAN details of the queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def find_seek_params(queryset) -> list:
+    """Return query parameters starting the first index range of the query.
+
+    EXPLAIN QUERY PLAN shows ``pub_date<?`` both for the cursor bound and
+    for the ``pub_date__lte=now`` filter, so the bytecode is read: the
+    parameters loaded into the key registers of the first Seek opcode.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}', params)
+        program = cursor.fetchall()
+    registers = {}
+    for _, opcode, p1, p2, p3, p4, *_ in program:
+        if opcode == 'Variable':
+            registers[p2] = params[p1 - 1]
+        elif opcode in SEEK_OPCODES:
+            return [
+                registers[register]
+                for register in range(p3, p3 + int(p4))
+                if register in registers
+            ]
+    return []
+
+
+def find_plan_problems(plan: list) -> list:
+    """Return plan steps with table scans or temporary sorts."""
+    return [
+        step for step in plan
+        if step.startswith('USE TEMP B-TREE')
+        or any(step.startswith(f'SCAN {table}') for table in CHECKED_TABLES)
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Check that the main query of every blog view is served '
+            'by an index without table scans and temporary sorts, and '
+            'that keyset pages start the index range at the cursor.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN needs SQLite database.')
+        cursor_param = connection.ops.adapt_datetimefield_value(
+            CURSOR_MOMENT
+        )
+        failed = []
+        for name, queryset in get_view_queries().items():
+            plan = explain(queryset)
+            problems = find_plan_problems(plan)
+            if name in KEYSET_QUERIES and (
+                cursor_param not in find_seek_params(queryset)
+            ):
+                problems.append('index range does not start at the cursor')
+            style = self.style.ERROR if problems else self.style.SUCCESS
+            self.stdout.write(style(f'{name}:'))
+            for step in plan:
+                self.stdout.write(f'  {step}')
+            for problem in problems:
+                if problem not in plan:
+                    self.stdout.write(style(f'  {problem}'))
+            if problems:
+                failed.append(name)
+        if failed:
+            raise CommandError(
+                f'Queries with plan problems: {", ".join(failed)}.'
+            )
@@ -0,0 +1,44 @@
+from contextlib import nullcontext
+
+from django.core.exceptions import FieldError, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import EXPORT_FORMATS
+from blog.models import Comment, Post
+
+MODELS = {'post': Post, 'comment': Comment}
+
+
+class Command(BaseCommand):
+    help = 'Stream posts or comments as CSV or JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=MODELS)
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='csv',
+            dest='export_format'
+        )
+        parser.add_argument(
+            '--output', help='File to write, standard output by default.'
+        )
+        parser.add_argument(
+            '--filter', action='append', default=[], dest='filters',
+            metavar='LOOKUP=VALUE',
+            help='Queryset filter, e.g. category__slug=travel; repeatable.'
+        )
+
+    def handle(self, *args, model, export_format, output=None, filters=(),
+               **options):
+        iter_lines = EXPORT_FORMATS[export_format][0]
+        stream = (
+            open(output, 'w', encoding='utf-8', newline='') if output
+            else nullcontext(self.stdout)
+        )
+        try:
+            lookups = dict(lookup.split('=', 1) for lookup in filters)
+            queryset = MODELS[model].objects.filter(**lookups).order_by('pk')
+            with stream as file:
+                for line in iter_lines(queryset):
+                    file.write(line)
+        except (ValueError, FieldError, ValidationError) as error:
+            raise CommandError(f'Wrong filter: {error}')
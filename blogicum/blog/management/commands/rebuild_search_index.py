@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.search import SEARCH_INDEXES, create_search_index
+
+
+class Command(BaseCommand):
+    help = ('Recreate missing search tables and triggers and reindex '
+            'posts, comments, categories and locations.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Full-text search needs SQLite database.')
+        with connection.schema_editor() as schema_editor:
+            for source in SEARCH_INDEXES:
+                create_search_index(schema_editor, source)
+        self.stdout.write(self.style.SUCCESS('Search indexes rebuilt.'))
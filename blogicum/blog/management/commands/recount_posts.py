@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.counters import INDEX_KEY, recount
+from blog.models import Category, Post, PostCounter
+from blog.visibility import update_visible_flags
+
+
+class Command(BaseCommand):
+    help = ('Rebuild visible flags of posts and stored post counters '
+            'of the feed, categories and authors.')
+
+    def handle(self, *args, **options):
+        authors = Post.objects.values_list('author_id', flat=True).distinct()
+        keys = {INDEX_KEY}
+        keys |= {
+            (PostCounter.CATEGORY, pk)
+            for pk in Category.objects.values_list('pk', flat=True)
+        }
+        for author_id in authors:
+            keys |= {
+                (PostCounter.AUTHOR, author_id),
+                (PostCounter.AUTHOR_ALL, author_id)
+            }
+        with transaction.atomic():
+            update_visible_flags(Post.objects.all())
+            PostCounter.objects.all().delete()
+            recount(keys)
+        self.stdout.write(self.style.SUCCESS(f'Counters rebuilt: {len(keys)}'))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+BATCH_SIZE = 500
+
+
+def get_actual_comment_count():
+    """Return expression counting comments of the outer post."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(
+                post=OuterRef('pk')
+            ).order_by().values('post').annotate(
+                count=Count('pk')
+            ).values('count'),
+            output_field=models.IntegerField()
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = 'Recount stored comment counters of posts that drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report posts with wrong counters.'
+        )
+
+    def handle(self, *args, dry_run=False, **options):
+        with transaction.atomic():
+            drifted = list(
+                Post.objects.annotate(
+                    actual_count=get_actual_comment_count()
+                ).exclude(
+                    comment_count=F('actual_count')
+                ).values_list('pk', 'comment_count', 'actual_count')
+            )
+            for pk, stored, actual in drifted:
+                self.stdout.write(f'Post {pk}: {stored} -> {actual}')
+            if not dry_run:
+                pks = [pk for pk, *_ in drifted]
+                for start in range(0, len(pks), BATCH_SIZE):
+                    Post.objects.filter(
+                        pk__in=pks[start:start + BATCH_SIZE]
+                    ).update(comment_count=get_actual_comment_count())
+        self.stdout.write(self.style.SUCCESS(
+            f'Drifted posts: {len(drifted)}'
+            + (' (dry run)' if dry_run else ', repaired.')
+        ))
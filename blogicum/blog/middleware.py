@@ -0,0 +1,186 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connections
+from django.shortcuts import render
+
+from blog.routers import has_written, pin_to_primary, use_primary
+from blog.writes import WriteContention
+
+logger = logging.getLogger('blog.queries')
+
+PRIMARY_COOKIE = 'blog_primary'
+
+PLACEHOLDER_LIST = re.compile(r'\((?:%s, )+%s\)')
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_query_template(sql: str) -> str:
+    """Return query shape with IN lists of any length collapsed."""
+    return PLACEHOLDER_LIST.sub('(%s, ...)', sql)
+
+
+def get_query_stats() -> dict:
+    """Return query totals collected in this process by URL name."""
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class QueryRecorder:
+    """Database execute wrapper counting queries and their templates."""
+
+    def __init__(self):
+        self.templates = Counter()
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.monotonic() - start
+            self.templates[get_query_template(sql)] += 1
+
+    @property
+    def count(self) -> int:
+        return sum(self.templates.values())
+
+    def get_repeated(self, limit: int) -> list:
+        """Return templates executed more than ``limit`` times."""
+        return [
+            (template, count)
+            for template, count in self.templates.most_common()
+            if count > limit
+        ]
+
+
+class QueryBudgetMiddleware:
+    """Record queries of every request and log budget violations.
+
+    Enabled by BLOG_QUERY_MONITOR. Totals are kept per resolved URL name,
+    e.g. ``blog:post_detail``; a request issuing more than
+    BLOG_QUERY_BUDGET queries, spending more than BLOG_QUERY_TIME_BUDGET
+    seconds in the database or repeating one query template more than
+    BLOG_QUERY_REPEATS times is logged to ``blog.queries``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.BLOG_QUERY_MONITOR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with self.wrap_connections(recorder):
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        name = match.view_name if match else request.path_info
+        self.record(name, recorder)
+        self.check_budget(name, recorder)
+        return response
+
+    @staticmethod
+    def wrap_connections(recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    @staticmethod
+    def record(name: str, recorder: QueryRecorder):
+        with _stats_lock:
+            stats = _stats.setdefault(name, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'time': 0.0
+            })
+            stats['requests'] += 1
+            stats['queries'] += recorder.count
+            stats['max_queries'] = max(stats['max_queries'], recorder.count)
+            stats['time'] += recorder.duration
+
+    @staticmethod
+    def check_budget(name: str, recorder: QueryRecorder):
+        if recorder.count > settings.BLOG_QUERY_BUDGET:
+            logger.warning(
+                '%s: %d queries, budget is %d; most frequent: %s',
+                name, recorder.count, settings.BLOG_QUERY_BUDGET,
+                recorder.templates.most_common(1)[0][0]
+            )
+        if recorder.duration > settings.BLOG_QUERY_TIME_BUDGET:
+            logger.warning(
+                '%s: %.3f s in database, budget is %.3f s',
+                name, recorder.duration, settings.BLOG_QUERY_TIME_BUDGET
+            )
+        for template, count in recorder.get_repeated(
+            settings.BLOG_QUERY_REPEATS
+        ):
+            logger.warning(
+                '%s: possible N+1, query repeated %d times: %s',
+                name, count, template
+            )
+
+
+class WriteContentionMiddleware:
+    """Answer 503 with Retry-After to writes that timed out on contention."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, WriteContention):
+            return None
+        response = render(request, 'pages/503.html', status=503)
+        response['Retry-After'] = math.ceil(settings.BLOG_WRITE_TIMEOUT)
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """Keep reads of a user who has just written on the primary.
+
+    A request that wrote to the database sets a cookie for
+    BLOG_REPLICA_STICKY seconds; while it lives, all reads of the user
+    skip the replicas, which may not have the new data yet.
+    """
+
+    def __init__(self, get_response):
+        if not settings.BLOG_READ_REPLICAS:
+            raise MiddlewareNotUsed
+        missing = set(settings.BLOG_READ_REPLICAS) - set(connections)
+        if missing:
+            raise ImproperlyConfigured(
+                f'BLOG_READ_REPLICAS not in DATABASES: {", ".join(missing)}'
+            )
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = use_primary.set(False), has_written.set(False)
+        try:
+            if PRIMARY_COOKIE in request.COOKIES:
+                pin_to_primary()
+            response = self.get_response(request)
+            if has_written.get():
+                response.set_cookie(
+                    PRIMARY_COOKIE, '1',
+                    max_age=settings.BLOG_REPLICA_STICKY,
+                    httponly=True, samesite='Lax'
+                )
+        finally:
+            for var, token in zip((use_primary, has_written), tokens):
+                var.reset(token)
+        return response
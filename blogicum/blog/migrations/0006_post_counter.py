@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('index', 'Лента'), ('category', 'Опубликованные в категории'), ('author', 'Опубликованные автора'), ('author_all', 'Все публикации автора')], max_length=16, verbose_name='Счётчик')),
+                ('object_id', models.PositiveBigIntegerField(default=0, verbose_name='ID категории или автора')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество публикаций')),
+            ],
+            options={
+                'verbose_name': 'счётчик публикаций',
+                'verbose_name_plural': 'Счётчики публикаций',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postcounter',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_post_counter'),
+        ),
+    ]
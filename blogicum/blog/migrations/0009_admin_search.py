@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from blog.search import create_search_index, drop_search_index
+
+SOURCES = ('blog_comment', 'blog_category', 'blog_location')
+
+
+def create_indexes(apps, schema_editor):
+    for source in SOURCES:
+        create_search_index(schema_editor, source)
+
+
+def drop_indexes(apps, schema_editor):
+    for source in SOURCES:
+        drop_search_index(schema_editor, source)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -96,10 +96,46 @@ class Post(PublishedModel):
         blank=True,
         verbose_name='Изображение'
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Видна в лентах',
+        help_text='Публикация и её категория опубликованы.'
+    )
 
     class Meta:
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('-pub_date', 'author', '-id'),
+                name='post_admin_list_idx'
+            ),
+        )
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
 
@@ -132,5 +168,51 @@ class Comment(PublishedModel):
     class Meta:
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx'
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+
+
+class PostCounter(models.Model):
+    INDEX = 'index'
+    CATEGORY = 'category'
+    AUTHOR = 'author'
+    AUTHOR_ALL = 'author_all'
+    KINDS = (
+        (INDEX, 'Лента'),
+        (CATEGORY, 'Опубликованные в категории'),
+        (AUTHOR, 'Опубликованные автора'),
+        (AUTHOR_ALL, 'Все публикации автора'),
+    )
+
+    kind = models.CharField(
+        max_length=16,
+        choices=KINDS,
+        verbose_name='Счётчик'
+    )
+    object_id = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='ID категории или автора'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество публикаций'
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('kind', 'object_id'),
+                name='unique_post_counter'
+            ),
+        )
+        verbose_name = 'счётчик публикаций'
+        verbose_name_plural = 'Счётчики публикаций'
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}={self.posts_count}'
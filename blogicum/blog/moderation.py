@@ -0,0 +1,198 @@
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from blog.cache import (
+    bump_on_commit, category_scope, changelist_scope, get_feed_scopes,
+    get_related_feed_scopes, object_scope
+)
+from blog.counters import get_counter_keys, recount
+from blog.models import Category, Comment, Location, Post, PostCounter
+from blog.visibility import reset_schedule, update_visible_flags
+from blog.writes import run_write
+
+MODERATION_BATCH_SIZE = 500
+
+
+def raw_delete(queryset) -> int:
+    """Delete rows with one DELETE, skipping signals and cascades.
+
+    Callers delete or detach dependent rows and do the bookkeeping of
+    blog.signals themselves.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def publish_posts(pks, is_published: bool):
+    posts = Post.objects.filter(pk__in=pks)
+    scopes = get_feed_scopes(posts)
+    posts.update(is_published=is_published)
+    update_visible_flags(posts)
+    if is_published:
+        reset_schedule()
+    recount(get_counter_keys(posts))
+    bump_on_commit(
+        changelist_scope('post'), *scopes, *get_feed_scopes(posts)
+    )
+
+
+def delete_posts(pks):
+    posts = Post.objects.filter(pk__in=pks)
+    keys = get_counter_keys(posts)
+    scopes = get_feed_scopes(posts)
+    raw_delete(Comment.objects.filter(post__in=pks))
+    raw_delete(posts)
+    recount(keys)
+    bump_on_commit(
+        changelist_scope('post'), changelist_scope('comment'), *scopes
+    )
+
+
+def publish_comments(pks, is_published: bool):
+    comments = Comment.objects.filter(pk__in=pks)
+    comments.update(is_published=is_published)
+    bump_on_commit(changelist_scope('comment'), *get_feed_scopes(
+        Post.objects.filter(pk__in=comments.values('post_id'))
+    ))
+
+
+def delete_comments(pks):
+    comments = Comment.objects.filter(pk__in=pks)
+    posts = Post.objects.filter(
+        pk__in=list(comments.values_list('post_id', flat=True).distinct())
+    )
+    raw_delete(comments)
+    posts.update(comment_count=Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+            'post'
+        ).annotate(count=Count('pk')).values('count')
+    ), Value(0)))
+    bump_on_commit(changelist_scope('comment'), *get_feed_scopes(posts))
+
+
+def get_category_scopes(categories) -> set:
+    """Return scopes of category pages and of cards of their posts."""
+    scopes = {changelist_scope('category'), changelist_scope('post')}
+    for pk, slug in categories.values_list('pk', 'slug'):
+        scopes |= {category_scope(slug), object_scope('category', pk)}
+    return scopes | get_related_feed_scopes(
+        Post.objects.filter(category__in=categories)
+    )
+
+
+def publish_categories(pks, is_published: bool):
+    categories = Category.objects.filter(pk__in=pks)
+    posts = Post.objects.filter(category__in=pks)
+    scopes = get_category_scopes(categories)
+    categories.update(is_published=is_published)
+    update_visible_flags(posts)
+    recount(get_counter_keys(posts) | {
+        (PostCounter.CATEGORY, pk) for pk in pks
+    })
+    bump_on_commit(*scopes, *get_feed_scopes(posts))
+
+
+def delete_categories(pks):
+    categories = Category.objects.filter(pk__in=pks)
+    posts = Post.objects.filter(category__in=pks)
+    keys = get_counter_keys(posts)
+    scopes = get_category_scopes(categories)
+    post_pks = list(posts.values_list('pk', flat=True))
+    Post.objects.filter(pk__in=post_pks).update(
+        category=None, is_visible=False
+    )
+    PostCounter.objects.filter(
+        kind=PostCounter.CATEGORY, object_id__in=pks
+    ).delete()
+    raw_delete(categories)
+    recount({key for key in keys if key[0] != PostCounter.CATEGORY})
+    bump_on_commit(*scopes)
+
+
+def get_location_scopes(pks) -> set:
+    return {changelist_scope('location'), changelist_scope('post')} | {
+        object_scope('location', pk) for pk in pks
+    } | get_related_feed_scopes(Post.objects.filter(location__in=pks))
+
+
+def publish_locations(pks, is_published: bool):
+    Location.objects.filter(pk__in=pks).update(is_published=is_published)
+    bump_on_commit(*get_location_scopes(pks))
+
+
+def delete_locations(pks):
+    scopes = get_location_scopes(pks)
+    Post.objects.filter(location__in=pks).update(location=None)
+    raw_delete(Location.objects.filter(pk__in=pks))
+    bump_on_commit(*scopes)
+
+
+PUBLISHERS = {
+    Post: publish_posts,
+    Comment: publish_comments,
+    Category: publish_categories,
+    Location: publish_locations,
+}
+DELETERS = {
+    Post: delete_posts,
+    Comment: delete_comments,
+    Category: delete_categories,
+    Location: delete_locations,
+}
+
+
+def iter_batches(queryset):
+    """Yield pks of the queryset rows by MODERATION_BATCH_SIZE."""
+    pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(pks), MODERATION_BATCH_SIZE):
+        yield pks[start:start + MODERATION_BATCH_SIZE]
+
+
+def set_published(queryset, is_published: bool) -> int:
+    """Publish or unpublish the rows with one write per batch.
+
+    Feeds, counters and caches are updated once per batch, not per row
+    as the signals of Model.save() do.
+    """
+    publish = PUBLISHERS[queryset.model]
+    count = 0
+    for pks in iter_batches(queryset):
+        run_write(lambda: publish(pks, is_published))
+        count += len(pks)
+    return count
+
+
+def log_deletions(model, pks, user_id: int):
+    """Add admin log entries of the rows with one insert."""
+    content_type = ContentType.objects.get_for_model(model)
+    LogEntry.objects.bulk_create(
+        LogEntry(
+            user_id=user_id,
+            content_type=content_type,
+            object_id=str(obj.pk),
+            object_repr=str(obj)[:200],
+            action_flag=DELETION,
+        )
+        for obj in model.objects.filter(pk__in=pks)
+    )
+
+
+def delete_in_batches(queryset, user_id=None) -> int:
+    """Delete the rows with one write per batch, see set_published().
+
+    With ``user_id`` the deletions are also logged in the admin log.
+    """
+    model = queryset.model
+    delete = DELETERS[model]
+
+    def delete_batch(pks):
+        if user_id is not None:
+            log_deletions(model, pks, user_id)
+        delete(pks)
+
+    count = 0
+    for pks in iter_batches(queryset):
+        run_write(lambda: delete_batch(pks))
+        count += len(pks)
+    return count
@@ -0,0 +1,162 @@
+from collections.abc import Sequence
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+from blog.cache import get_or_build
+from blog.counters import get_posts_count
+
+CURSOR_SEPARATOR = '.'
+# Range of SQLite INTEGER primary keys.
+MAX_PK = 2 ** 63 - 1
+
+
+def encode_cursor(moment: datetime, pk: int) -> str:
+    """Return URL-safe cursor for the (datetime, pk) pair."""
+    delta = moment - datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    micros = (delta.days * 86400 + delta.seconds) * 10 ** 6
+    return f'{micros + delta.microseconds}{CURSOR_SEPARATOR}{pk}'
+
+
+def decode_cursor(cursor: str):
+    """Return (datetime, pk) pair or None for a malformed cursor."""
+    try:
+        micros, pk = (int(part) for part in cursor.split(CURSOR_SEPARATOR))
+        moment = datetime.fromtimestamp(micros // 10 ** 6, dt_timezone.utc)
+    except (AttributeError, ValueError, OverflowError, OSError):
+        return None
+    if not 1 <= pk <= MAX_PK:
+        return None
+    return moment.replace(microsecond=micros % 10 ** 6), pk
+
+
+class KeysetPage(Sequence):
+    """Page of objects fetched by a keyset (cursor) query."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous, field=None):
+        self.object_list = list(object_list)
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = self.previous_cursor = None
+        if self.object_list and field:
+            first, last = self.object_list[0], self.object_list[-1]
+            self.previous_cursor = encode_cursor(
+                getattr(first, field), first.pk
+            )
+            self.next_cursor = encode_cursor(getattr(last, field), last.pk)
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginator:
+    """Paginate queryset by (field, pk) instead of LIMIT/OFFSET.
+
+    Every page is a single indexed range query of ``per_page + 1`` rows,
+    so deep pages cost the same as the first one and rows inserted
+    between requests never shift the page boundaries.
+    """
+
+    def __init__(self, object_list: QuerySet, per_page: int,
+                 ordering: str = '-pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+
+    def _order(self, queryset, reverse=False):
+        prefix = '-' if self.descending != reverse else ''
+        return queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+
+    def _seek(self, queryset, cursor, forward=True):
+        moment, pk = cursor
+        lookup = 'lt' if self.descending == forward else 'gt'
+        queryset = queryset.filter(**{f'{self.field}__{lookup}e': moment})
+        # The redundant inclusive bound starts the index range at the
+        # cursor. SQLite bounds the range by the first matching term, so
+        # it must precede filters like ``pub_date__lte=now``; otherwise a
+        # deep page walks the index from "now" down to the cursor. The
+        # query plan looks the same either way, check_query_plans reads
+        # the bytecode to verify the range starts at the cursor.
+        where = queryset.query.where
+        where.children.insert(0, where.children.pop())
+        return queryset.filter(
+            Q(**{f'{self.field}__{lookup}': moment})
+            | Q(**{self.field: moment, f'pk__{lookup}': pk})
+        )
+
+    def get_queryset(self, after: str = None) -> QuerySet:
+        """Return query of the page following ``after`` cursor."""
+        queryset = self.object_list
+        after = decode_cursor(after) if after else None
+        if after:
+            queryset = self._seek(queryset, after)
+        return self._order(queryset)[:self.per_page + 1]
+
+    def get_page(self, after: str = None, before: str = None) -> KeysetPage:
+        """Return page following ``after`` or preceding ``before`` cursor."""
+        before = decode_cursor(before) if before else None
+        if before and not after:
+            rows = list(self._order(
+                self._seek(self.object_list, before, forward=False),
+                reverse=True
+            )[:self.per_page + 1])
+            return KeysetPage(
+                reversed(rows[:self.per_page]),
+                has_next=True,
+                has_previous=len(rows) > self.per_page,
+                field=self.field
+            )
+        rows = list(self.get_queryset(after))
+        return KeysetPage(
+            rows[:self.per_page],
+            has_next=len(rows) > self.per_page,
+            has_previous=decode_cursor(after or '') is not None,
+            field=self.field
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator sharing total count of a feed between all its pages.
+
+    The count is cached until any of the scopes is bumped, so publishing
+    or unpublishing a post recounts it, and paging does not. With
+    ``counter`` set to ``(kind, object_id)`` the count is read from the
+    stored post counter instead.
+    """
+
+    def __init__(self, object_list, per_page, scopes=(), key='',
+                 counter=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scopes = scopes
+        self.key = key
+        self.counter = counter
+
+    @cached_property
+    def count(self):
+        if self.counter is not None:
+            return get_posts_count(*self.counter)
+        if not self.scopes:
+            return super().count
+        return get_or_build(
+            'count', self.scopes, (self.key,), self.object_list.count
+        )
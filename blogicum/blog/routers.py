@@ -0,0 +1,58 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DB = 'default'
+
+use_primary = ContextVar('blog_use_primary', default=False)
+has_written = ContextVar('blog_has_written', default=False)
+
+
+def pin_to_primary():
+    """Send reads of the current request or task to the primary."""
+    use_primary.set(True)
+
+
+@contextmanager
+def reading_from_primary():
+    """Send reads inside the block to the primary.
+
+    Values of recently bumped cache scopes are built this way: a replica
+    lagging behind a write would otherwise put stale data under the
+    generation bumped by that write.
+    """
+    token = use_primary.set(True)
+    try:
+        yield
+    finally:
+        use_primary.reset(token)
+
+
+class ReplicaRouter:
+    """Read from BLOG_READ_REPLICAS, write to the primary database.
+
+    After the first write, reads of the same request go to the primary
+    too, so signals and views see the data they have just written.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.BLOG_READ_REPLICAS or use_primary.get():
+            return PRIMARY_DB
+        return random.choice(settings.BLOG_READ_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        has_written.set(True)
+        pin_to_primary()
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary, objects from any of them
+        # may be related.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.BLOG_READ_REPLICAS:
+            return False
+        return None
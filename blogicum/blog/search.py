@@ -0,0 +1,262 @@
+import logging
+import math
+import re
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError, connections, router
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog.models import Post
+from blog.paginators import MAX_PK, KeysetPage
+
+logger = logging.getLogger('blog.search')
+
+MAX_TERMS = 8
+MARK_START, MARK_END = '\x02', '\x03'
+SNIPPET_TOKENS = 24
+# BM25 weights of the title and text columns.
+RANK = 'bm25(10.0, 1.0)'
+# SQLite VM instructions between checks of the admin search deadline.
+PROGRESS_STEPS = 1000
+FETCH_SIZE = 100
+
+# Indexed columns by table. Every table gets an external content FTS5
+# table named <table>_search, kept in sync by triggers with every
+# insert, update and delete, including queryset updates. Note that
+# SQLite drops triggers when a migration rebuilds the table: such
+# migrations must call create_search_index() again.
+SEARCH_INDEXES = {
+    'blog_post': ('title', 'text'),
+    'blog_comment': ('text',),
+    'blog_category': ('title', 'description', 'slug'),
+    'blog_location': ('name',),
+}
+SEARCH_TABLE = 'blog_post_search'
+
+
+def get_search_schema(source: str) -> list:
+    """Return statements creating the search table and its triggers."""
+    table = f'{source}_search'
+    columns = ', '.join(SEARCH_INDEXES[source])
+    old = ', '.join(f'old.{column}' for column in SEARCH_INDEXES[source])
+    new = ', '.join(f'new.{column}' for column in SEARCH_INDEXES[source])
+    schema = [
+        f'''CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+            {columns},
+            content='{source}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='3'
+        )''',
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_insert
+        AFTER INSERT ON {source} BEGIN
+            INSERT INTO {table} (rowid, {columns}) VALUES (new.id, {new});
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_delete
+        AFTER DELETE ON {source} BEGIN
+            INSERT INTO {table} ({table}, rowid, {columns})
+            VALUES ('delete', old.id, {old});
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_update
+        AFTER UPDATE OF {columns} ON {source} BEGIN
+            INSERT INTO {table} ({table}, rowid, {columns})
+            VALUES ('delete', old.id, {old});
+            INSERT INTO {table} (rowid, {columns}) VALUES (new.id, {new});
+        END''',
+    ]
+    if source == 'blog_post':
+        schema.append(
+            f"INSERT INTO {table} ({table}, rank) VALUES ('rank', '{RANK}')"
+        )
+    return schema
+
+
+SEARCH_SQL = f'''
+    SELECT blog_post.id, {SEARCH_TABLE}.rank,
+        highlight({SEARCH_TABLE}, 0, %s, %s),
+        snippet({SEARCH_TABLE}, 1, %s, %s, '…', {SNIPPET_TOKENS})
+    FROM {SEARCH_TABLE}
+    JOIN blog_post ON blog_post.id = {SEARCH_TABLE}.rowid
+    WHERE {SEARCH_TABLE} MATCH %s
+        AND blog_post.is_visible AND blog_post.pub_date <= %s
+        {{seek}}
+    ORDER BY {SEARCH_TABLE}.rank, blog_post.id
+    LIMIT %s
+'''
+SEEK_SQL = f'''AND ({SEARCH_TABLE}.rank > %s
+        OR ({SEARCH_TABLE}.rank = %s AND blog_post.id > %s))'''
+
+
+def create_search_index(schema_editor, source: str = 'blog_post'):
+    """Create the search table and triggers and index existing rows."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in get_search_schema(source):
+        schema_editor.execute(statement)
+    rebuild_search_index(schema_editor.connection, source)
+
+
+def drop_search_index(schema_editor, source: str = 'blog_post'):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in ('insert', 'delete', 'update'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {source}_search_{name}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {source}_search')
+
+
+def rebuild_search_index(connection, source: str = 'blog_post'):
+    """Reindex all rows of the table."""
+    table = f'{source}_search'
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+
+
+def get_match_query(query: str, prefix: bool = False) -> str:
+    """Return FTS5 query matching all words of user input.
+
+    Words are quoted, so FTS5 operators are plain text; a word ending
+    with ``*`` or any word with ``prefix`` is matched as a prefix.
+    """
+    return ' '.join(
+        f'"{word}"{"*" if prefix else star}'
+        for word, star in re.findall(r'(\w+)(\*?)', query)[:MAX_TERMS]
+    )
+
+
+def encode_search_cursor(rank: float, pk: int) -> str:
+    return f'{rank!r}~{pk}'
+
+
+def decode_search_cursor(cursor: str):
+    """Return (rank, pk) pair or None for a malformed cursor."""
+    try:
+        rank, pk = cursor.split('~')
+        rank, pk = float(rank), int(pk)
+    except (AttributeError, ValueError):
+        return None
+    if not math.isfinite(rank) or not 1 <= pk <= MAX_PK:
+        return None
+    return rank, pk
+
+
+def mark_matches(text: str) -> str:
+    """Escape text and turn match markers into <mark> tags."""
+    return mark_safe(
+        escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    )
+
+
+def search_posts(query: str, now, per_page: int,
+                 after: str = None) -> KeysetPage:
+    """Return page of visible posts matching query, best ranked first.
+
+    Every post gets ``search_rank``, ``search_title`` and
+    ``search_snippet`` with the matched words highlighted.
+    """
+    match = get_match_query(query)
+    if not match:
+        return KeysetPage([], has_next=False, has_previous=False)
+    cursor = decode_search_cursor(after) if after else None
+    connection = connections[router.db_for_read(Post)]
+    params = [
+        MARK_START, MARK_END, MARK_START, MARK_END, match,
+        connection.ops.adapt_datetimefield_value(now)
+    ]
+    seek = ''
+    if cursor:
+        seek = SEEK_SQL
+        params += [cursor[0], cursor[0], cursor[1]]
+    with connection.cursor() as db:
+        db.execute(SEARCH_SQL.format(seek=seek), params + [per_page + 1])
+        rows = db.fetchall()
+    # Posts deleted after the search query are skipped.
+    posts = Post.objects.using(connection.alias).select_related(
+        'category', 'author', 'location'
+    ).in_bulk([row[0] for row in rows[:per_page]])
+    results = []
+    for pk, rank, title, snippet in rows[:per_page]:
+        if pk not in posts:
+            continue
+        post = posts[pk]
+        post.search_rank = rank
+        post.search_title = mark_matches(title)
+        post.search_snippet = mark_matches(snippet)
+        results.append(post)
+    page = KeysetPage(
+        results,
+        has_next=len(rows) > per_page,
+        has_previous=cursor is not None
+    )
+    if rows:
+        pk, rank = rows[:per_page][-1][:2]
+        page.next_cursor = encode_search_cursor(rank, pk)
+    return page
+
+
+@contextmanager
+def time_limit(connection, seconds: float):
+    """Interrupt queries of the connection running after the deadline."""
+    connection.ensure_connection()
+    deadline = time.monotonic() + seconds
+    connection.connection.set_progress_handler(
+        lambda: time.monotonic() > deadline, PROGRESS_STEPS
+    )
+    try:
+        yield
+    finally:
+        connection.connection.set_progress_handler(None, 0)
+
+
+def find_matching_ids(model, query: str, limit: int, budget: float):
+    """Return ids of the newest rows matching every word of query.
+
+    Every word matches as a prefix. Returns ``(ids, complete)``, where
+    ``complete`` is False when the search hit ``limit`` or ran out of
+    ``budget`` seconds and ``ids`` holds the rows found so far; returns
+    None when the model has no search index or the query has no words.
+    A missing search table raises OperationalError.
+    """
+    source = model._meta.db_table
+    match = get_match_query(query, prefix=True)
+    connection = connections[router.db_for_read(model)]
+    if (source not in SEARCH_INDEXES or connection.vendor != 'sqlite'
+            or not match):
+        return None
+    ids = []
+    with time_limit(connection, budget), connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f'''SELECT rowid FROM {source}_search
+                WHERE {source}_search MATCH %s
+                ORDER BY rowid DESC LIMIT %s''',
+                [match, limit + 1]
+            )
+            for rows in iter(lambda: cursor.fetchmany(FETCH_SIZE), []):
+                ids.extend(row[0] for row in rows)
+        except OperationalError as error:
+            if 'interrupted' not in str(error):
+                raise
+            return ids, False
+    return ids[:limit], len(ids) <= limit
+
+
+def search_by_prefix(queryset, query: str, field: str, limit: int):
+    """Return up to ``limit`` rows with words starting with query words.
+
+    Uses the full-text index of the model; without it falls back to
+    ``field`` starting with the query.
+    """
+    try:
+        found = find_matching_ids(
+            queryset.model, query, limit, settings.BLOG_AUTOCOMPLETE_BUDGET
+        )
+    except OperationalError as error:
+        logger.warning('%s search index: %s', queryset.model.__name__, error)
+        found = None
+    if found is None:
+        queryset = queryset.filter(**{f'{field}__istartswith': query.strip()})
+    else:
+        queryset = queryset.filter(pk__in=found[0])
+    return queryset.order_by(field)[:limit]
@@ -0,0 +1,240 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from blog.cache import (
+    author_scope, bump_on_commit, category_scope, changelist_scope,
+    get_feed_scopes, get_related_feed_scopes, object_scope
+)
+from blog.counters import get_counter_keys, recount
+from blog.models import Category, Comment, Location, Post, PostCounter, User
+from blog.visibility import is_visible, reset_schedule, update_visible_flags
+
+# Posts being deleted: their comments go with them, so the comment
+# counter and feeds are not touched once per cascaded comment.
+deleting_posts = ContextVar('blog_deleting_posts', default=frozenset())
+
+
+@receiver(connection_created)
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    """Tune new SQLite connection with BLOG_SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.BLOG_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def change_comment_count(post_id, delta):
+    """Atomically shift stored comment counter of the post.
+
+    The counter never goes below zero, even if it has drifted.
+    """
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0)
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    """Remember post of edited comment to move its counter."""
+    instance._previous_post_id = None
+    if not instance._state.adding:
+        instance._previous_post_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list('post_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    """Count new comment or comment moved to another post.
+
+    Feeds show only comment counters, so other edits invalidate just the
+    comment changelist.
+    """
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+    else:
+        bump_on_commit(changelist_scope('comment'))
+        return
+    bump_on_commit(changelist_scope('comment'), *get_feed_scopes(
+        Post.objects.filter(pk__in=(instance.post_id, previous_post_id))
+    ))
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Uncount comment deleted by view, admin or cascade."""
+    if instance.post_id in deleting_posts.get():
+        return
+    change_comment_count(instance.post_id, -1)
+    bump_on_commit(changelist_scope('comment'), *get_feed_scopes(
+        Post.objects.filter(pk=instance.post_id)
+    ))
+
+
+@receiver(pre_save, sender=Post)
+def set_post_visible_flag(sender, instance, **kwargs):
+    """Materialize visibility of the post in feeds."""
+    instance.is_visible = is_visible(instance)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_feeds(sender, instance, **kwargs):
+    """Remember feeds and counters including the post before it changes."""
+    if kwargs['signal'] is pre_delete:
+        deleting_posts.set(deleting_posts.get() | {instance.pk})
+    instance._previous_scopes = set()
+    instance._previous_counters = set()
+    if not instance._state.adding:
+        previous = Post.objects.filter(pk=instance.pk)
+        instance._previous_scopes = get_feed_scopes(previous)
+        instance._previous_counters = get_counter_keys(previous)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, update_fields=None, **kwargs):
+    """Recount and invalidate feeds listing the post before and after."""
+    if update_fields is not None and 'is_visible' not in update_fields:
+        Post.objects.filter(pk=instance.pk).update(
+            is_visible=instance.is_visible
+        )
+    if instance.is_published:
+        reset_schedule()
+    current = Post.objects.filter(pk=instance.pk)
+    recount(instance._previous_counters | get_counter_keys(current))
+    bump_on_commit(
+        changelist_scope('post'),
+        *instance._previous_scopes,
+        *get_feed_scopes(current)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    """Recount and invalidate feeds that listed the deleted post."""
+    deleting_posts.set(deleting_posts.get() - {instance.pk})
+    recount(getattr(instance, '_previous_counters', ()))
+    bump_on_commit(
+        changelist_scope('post'),
+        changelist_scope('comment'),
+        *getattr(instance, '_previous_scopes', ())
+    )
+
+
+@receiver(pre_save, sender=Category)
+def remember_category(sender, instance, **kwargs):
+    """Remember category fields shown outside of its own page."""
+    instance._previous = None
+    if not instance._state.adding:
+        instance._previous = Category.objects.filter(
+            pk=instance.pk
+        ).values('slug', 'title', 'is_published').first()
+
+
+@receiver(post_save, sender=Category)
+def invalidate_saved_category(sender, instance, **kwargs):
+    """Invalidate category page and, if cards change, feeds of its posts."""
+    previous = getattr(instance, '_previous', None) or {}
+    if previous.get('is_published') != instance.is_published:
+        update_visible_flags(Post.objects.filter(category=instance))
+        recount(get_counter_keys(Post.objects.filter(category=instance)) | {
+            (PostCounter.CATEGORY, instance.pk)
+        })
+    scopes = {category_scope(instance.slug), changelist_scope('category')}
+    if previous:
+        scopes.add(category_scope(previous['slug']))
+    if any(
+        previous.get(field) != getattr(instance, field)
+        for field in ('slug', 'title', 'is_published')
+    ):
+        scopes |= get_related_feed_scopes(
+            Post.objects.filter(category=instance)
+        )
+        scopes.add(object_scope('category', instance.pk))
+    bump_on_commit(*scopes)
+
+
+@receiver(pre_delete, sender=Category)
+def invalidate_deleted_category(sender, instance, **kwargs):
+    """Invalidate feeds of posts losing the category."""
+    posts = Post.objects.filter(category=instance)
+    posts.update(is_visible=False)
+    instance._previous_counters = get_counter_keys(posts)
+    bump_on_commit(
+        category_scope(instance.slug),
+        changelist_scope('category'),
+        changelist_scope('post'),
+        *get_related_feed_scopes(posts)
+    )
+
+
+@receiver(post_delete, sender=Category)
+def recount_deleted_category(sender, instance, **kwargs):
+    """Drop counter of the category and recount its former posts."""
+    key = (PostCounter.CATEGORY, instance.pk)
+    PostCounter.objects.filter(kind=key[0], object_id=key[1]).delete()
+    recount(getattr(instance, '_previous_counters', set()) - {key})
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    """Invalidate feeds showing the location in post cards."""
+    bump_on_commit(
+        object_scope('location', instance.pk),
+        changelist_scope('location'),
+        changelist_scope('post'),
+        *get_related_feed_scopes(Post.objects.filter(location=instance))
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    """Remember username to invalidate feeds on rename."""
+    instance._previous_username = instance.username
+    if instance._state.adding:
+        instance._previous_username = None
+    elif update_fields is None or 'username' in update_fields:
+        instance._previous_username = User.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author(sender, instance, created, update_fields=None,
+                      **kwargs):
+    """Invalidate profile page and, on rename, post cards of the author."""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    scopes = {author_scope(instance.username)}
+    previous = getattr(instance, '_previous_username', None)
+    if previous != instance.username:
+        scopes.add(author_scope(previous))
+        scopes |= get_related_feed_scopes(
+            Post.objects.filter(author=instance)
+        )
+        scopes.add(object_scope('user', instance.pk))
+    bump_on_commit(*scopes)
+
+
+@receiver(post_delete, sender=User)
+def drop_author_counters(sender, instance, **kwargs):
+    """Drop post counters of the deleted user."""
+    PostCounter.objects.filter(
+        kind__in=(PostCounter.AUTHOR, PostCounter.AUTHOR_ALL),
+        object_id=instance.pk
+    ).delete()
@@ -41,6 +41,11 @@ urlpatterns = [
                      views.CommentCreateView.as_view(),
                      name='add_comment'
                  ),
+                 path(
+                     '<int:post_id>/comments/',
+                     views.show_comments,
+                     name='post_comments'
+                 ),
                  path(
                      '<int:post_id>/',
                      views.show_post,
@@ -58,5 +63,11 @@ urlpatterns = [
         views.show_category,
         name='category_posts'
     ),
+    path('search/', views.search, name='search'),
+    path(
+        'autocomplete/<slug:model_name>/',
+        views.autocomplete,
+        name='autocomplete'
+    ),
     path('', views.IndexListView.as_view(), name='index'),
 ]
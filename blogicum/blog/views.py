@@ -1,25 +1,45 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.core.paginator import Paginator
-from django.db.models import Count
+from django.core.paginator import Page, Paginator
 from django.db.models.manager import Manager
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse_lazy, reverse
-from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView, UpdateView, DeleteView, TemplateView, ListView
 
+from blog.cache import (
+    INDEX_SCOPE, attach_card_keys, author_scope, category_scope,
+    get_or_build
+)
+from blog.counters import get_posts_count
+from blog.decorators import cache_anonymous_page
 from blog.forms import ProfileEditForm, PostForm, CommentForm
-from blog.models import Post, Category, User, Comment
+from blog.models import (
+    Post, Category, Location, User, Comment, PostCounter
+)
+from blog.paginators import CachedCountPaginator, KeysetPaginator
+from blog.search import search_by_prefix, search_posts
+from blog.visibility import visibility_now
+from blog.writes import run_write
 
 OBJECTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+PAGES_ON_EACH_SIDE = 2
+PAGES_ON_ENDS = 1
 SUCCESS_URL = reverse_lazy('blog:index')
+# Models of the post form autocomplete and fields their choices start.
+AUTOCOMPLETE_MODELS = {
+    'category': (Category, 'title'),
+    'location': (Location, 'name'),
+}
 
 
 def get_posts(
         posts: Manager = Post.objects,
         select_related: bool = True,
-        published: bool = True,
-        count_comments: bool = True
+        published: bool = True
 ) -> Manager:
     """Return posts."""
     if select_related:
@@ -30,29 +50,76 @@ def get_posts(
         )
     if published:
         posts = posts.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
-        )
-    if count_comments:
-        posts = posts.annotate(
-            comment_count=Count('comments')
-        ).order_by(
-            *posts.model._meta.ordering
+            is_visible=True,
+            pub_date__lte=visibility_now()
         )
     return posts
 
 
+def is_keyset_pagination(request) -> bool:
+    """Check if the page should be fetched by cursor."""
+    return (settings.BLOG_PAGINATION == 'keyset'
+            or 'after' in request.GET
+            or 'before' in request.GET)
+
+
 def get_paginator(
     request,
     model_objects: Manager,
-    per_page: int = OBJECTS_PER_PAGE
+    per_page: int = OBJECTS_PER_PAGE,
+    scopes: tuple = (),
+    variant: str = '',
+    counter: tuple = None
 ) -> Paginator:
-    """Return paginator."""
-    return (Paginator(model_objects, per_page)
-            .get_page(request.GET.get('page')))
-
+    """Return page of objects cached until any of the scopes changes."""
+    def cached(parts, build):
+        if not scopes:
+            return build()
+        return get_or_build(
+            'page',
+            scopes,
+            (request.resolver_match.view_name, variant, *parts),
+            build
+        )
 
+    if is_keyset_pagination(request):
+        after = request.GET.get('after')
+        before = request.GET.get('before')
+        page = cached(
+            ('keyset', after, before),
+            lambda: KeysetPaginator(model_objects, per_page).get_page(
+                after=after, before=before
+            )
+        )
+    else:
+        paginator = CachedCountPaginator(
+            model_objects,
+            per_page,
+            scopes=scopes,
+            key=f'{request.resolver_match.view_name}:{variant}',
+            counter=counter
+        )
+        number = request.GET.get('page')
+
+        def build():
+            page = paginator.get_page(number)
+            return list(page.object_list), page.number
+
+        object_list, number = cached(('pages', number), build)
+        page = Page(object_list, number, paginator)
+        page.page_range = list(paginator.get_elided_page_range(
+            number,
+            on_each_side=PAGES_ON_EACH_SIDE,
+            on_ends=PAGES_ON_ENDS
+        ))
+    attach_card_keys(page.object_list)
+    return page
+
+
+@method_decorator(
+    cache_anonymous_page(lambda: (INDEX_SCOPE,)),
+    name='dispatch'
+)
 class IndexListView(ListView):
     model = Post
     template_name = 'blog/index.html'
@@ -61,25 +128,100 @@ class IndexListView(ListView):
     def get_queryset(self):
         return get_posts()
 
+    def paginate_queryset(self, queryset, page_size):
+        page = get_paginator(
+            self.request,
+            queryset,
+            page_size,
+            scopes=(INDEX_SCOPE,),
+            counter=(PostCounter.INDEX, 0)
+        )
+        return (getattr(page, 'paginator', None), page, page.object_list,
+                page.has_other_pages())
+
+
+def is_post_visible(post: Post) -> bool:
+    """Check post against the same rules as get_posts(published=True)."""
+    return post.is_visible and post.pub_date <= visibility_now()
+
+
+def get_post_detail(user, post_id: int) -> Post:
+    """Return post with relations visible to user or raise Http404."""
+    post = get_object_or_404(
+        Post.objects.select_related('category', 'author', 'location'),
+        pk=post_id
+    )
+    if post.author_id != user.id and not is_post_visible(post):
+        raise Http404
+    return post
+
+
+def get_comments_page(request, post: Post):
+    """Return page of post comments following ``after`` cursor."""
+    return KeysetPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_PER_PAGE,
+        ordering='created_at'
+    ).get_page(after=request.GET.get('after'))
+
 
 def show_post(request, post_id):
     """View post details."""
-    post = get_object_or_404(Post, pk=post_id)
-    if post.author.id != request.user.id:
-        post = get_object_or_404(
-            get_posts(
-                select_related=False,
-                count_comments=False
-            ),
-            pk=post_id
-        )
+    post = get_post_detail(request.user, post_id)
     return render(request, 'blog/detail.html', {
         'post': post,
         'form': CommentForm(),
-        'comments': post.comments.all()
+        'comments': get_comments_page(request, post)
+    })
+
+
+def show_comments(request, post_id):
+    """View next page of post comments as HTML fragment."""
+    post = get_post_detail(request.user, post_id)
+    return render(request, 'includes/comment_list.html', {
+        'post': post,
+        'comments': get_comments_page(request, post)
+    })
+
+
+def search(request):
+    """View visible posts matching the query, best ranked first."""
+    query = request.GET.get('q', '').strip()
+    return render(request, 'blog/search.html', {
+        'query': query,
+        'page_obj': search_posts(
+            query,
+            visibility_now(),
+            OBJECTS_PER_PAGE,
+            after=request.GET.get('after')
+        )
+    })
+
+
+@login_required
+def autocomplete(request, model_name):
+    """Return choices of the post form field matching the typed words."""
+    if model_name not in AUTOCOMPLETE_MODELS:
+        raise Http404
+    model, field = AUTOCOMPLETE_MODELS[model_name]
+    objects = search_by_prefix(
+        model.objects.all(),
+        request.GET.get('q', ''),
+        field,
+        settings.BLOG_AUTOCOMPLETE_LIMIT
+    )
+    return JsonResponse({
+        'results': [{'id': obj.pk, 'text': str(obj)} for obj in objects]
     })
 
 
+def save_new_object(form):
+    """Save form of a new object, starting over if the write is retried."""
+    form.instance.pk = None
+    form.instance._state.adding = True
+    return form.save()
+
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     """Create new post."""
 
@@ -91,7 +233,8 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         """Add current user to post."""
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        self.object = run_write(lambda: save_new_object(form))
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
         return reverse(
@@ -103,7 +246,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 def edit_post(request, post_id):
     """Edit post."""
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.id:
         return redirect(post)
     form = PostForm(request.POST or None, instance=post)
     if form.is_valid():
@@ -114,7 +257,28 @@ def edit_post(request, post_id):
     })
 
 
-class PostDeleteView(UserPassesTestMixin, DeleteView):
+class AuthorPassesTestMixin(UserPassesTestMixin):
+    """Allow only author of the object, fetching the object once.
+
+    The object is loaded with its author for the check and then reused
+    by get_object() calls of the view itself.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('author')
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def test_func(self):
+        return self.get_object().author_id == self.request.user.id
+
+
+class PostDeleteView(AuthorPassesTestMixin, DeleteView):
     """Delete post."""
 
     model = Post
@@ -123,10 +287,10 @@ class PostDeleteView(UserPassesTestMixin, DeleteView):
     pk_url_kwarg = 'post_id'
     success_url = SUCCESS_URL
 
-    def test_func(self):
-        return self.get_object().author == self.request.user
-
 
+@cache_anonymous_page(
+    lambda category_slug: (category_scope(category_slug),)
+)
 def show_category(request, category_slug):
     """View published posts in category, if pub date less than now."""
     category = get_object_or_404(
@@ -134,25 +298,39 @@ def show_category(request, category_slug):
         slug=category_slug,
         is_published=True
     )
+    counter = (PostCounter.CATEGORY, category.pk)
     return render(request, 'blog/category.html', {
         'category': category,
+        'posts_count': get_posts_count(*counter),
         'page_obj': get_paginator(
             request,
-            get_posts(category.posts)
+            get_posts(category.posts),
+            scopes=(category_scope(category.slug),),
+            counter=counter
         )
     })
 
 
+@cache_anonymous_page(lambda username: (author_scope(username),))
 def show_profile(request, username):
     """View user's profile with posts."""
     author = get_object_or_404(User, username=username)
-    posts = get_posts(
-        author.posts,
-        published=False if request.user == author else True
+    is_author = request.user == author
+    posts = get_posts(author.posts, published=not is_author)
+    counter = (
+        PostCounter.AUTHOR_ALL if is_author else PostCounter.AUTHOR,
+        author.pk
     )
     return render(request, 'blog/profile.html', {
         'profile': author,
-        'page_obj': get_paginator(request, posts)
+        'posts_count': get_posts_count(*counter),
+        'page_obj': get_paginator(
+            request,
+            posts,
+            scopes=(author_scope(author.username),),
+            variant='author' if is_author else 'reader',
+            counter=counter
+        )
     })
 
 
@@ -177,7 +355,8 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        return super().form_valid(form)
+        self.object = run_write(lambda: save_new_object(form))
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
         return reverse(
@@ -185,7 +364,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class CommentUserPassesTestMixin(UserPassesTestMixin):
+class CommentUserPassesTestMixin(AuthorPassesTestMixin):
     """Mixin class for checking author"""
 
     model = Comment
@@ -193,9 +372,6 @@ class CommentUserPassesTestMixin(UserPassesTestMixin):
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def test_func(self):
-        return self.get_object().author == self.request.user
-
 
 class CommentUpdateView(CommentUserPassesTestMixin, UpdateView):
     """Update comment."""
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from blog.cache import bump, bump_on_commit, get_feed_scopes, make_key
+from blog.counters import get_counter_keys, recount
+from blog.models import Category, Post
+from blog.routers import reading_from_primary
+
+SCHEDULE_SCOPE = 'visibility:schedule'
+VISIBLE_BATCH_SIZE = 500
+
+
+def is_visible(post: Post) -> bool:
+    """Check if post and its category are published."""
+    return post.is_published and Category.objects.filter(
+        pk=post.category_id, is_published=True
+    ).exists()
+
+
+def update_visible_flags(posts):
+    """Recompute ``is_visible`` of the posts in batched bulk updates."""
+    pks = list(posts.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(pks), VISIBLE_BATCH_SIZE):
+        batch = Post.objects.filter(
+            pk__in=pks[start:start + VISIBLE_BATCH_SIZE]
+        )
+        batch.filter(
+            is_published=True, category__is_published=True
+        ).update(is_visible=True)
+        batch.exclude(
+            is_published=True, category__is_published=True
+        ).update(is_visible=False)
+
+
+def floor_to_bucket(moment: datetime) -> datetime:
+    """Round moment down to BLOG_VISIBILITY_BUCKET seconds."""
+    bucket = settings.BLOG_VISIBILITY_BUCKET
+    timestamp = int(moment.timestamp())
+    return datetime.fromtimestamp(
+        timestamp - timestamp % bucket, dt_timezone.utc
+    )
+
+
+def build_schedule(now: datetime) -> dict:
+    """Return last passed and next future pub_date of published posts."""
+    published = Post.objects.filter(is_published=True)
+    return {
+        'last': published.filter(
+            pub_date__lte=now
+        ).aggregate(last=Max('pub_date'))['last'],
+        'next': published.filter(
+            pub_date__gt=now
+        ).aggregate(next=Min('pub_date'))['next'],
+    }
+
+
+def get_schedule(now: datetime) -> dict:
+    """Return schedule, invalidating feeds of posts that became visible.
+
+    The schedule is cached per generation of SCHEDULE_SCOPE: a rebuild
+    racing with reset_schedule() is stored under a stale key.
+    """
+    key = make_key('visibility', (SCHEDULE_SCOPE,), 'schedule')
+    schedule = cache.get(key)
+    if schedule is not None and (
+        schedule['next'] is None or schedule['next'] > now
+    ):
+        return schedule
+    if schedule is None:
+        # Without a schedule we cannot tell what was crossed, but cached
+        # pages older than BLOG_CACHE_TIMEOUT are gone anyway.
+        since = now - timedelta(seconds=settings.BLOG_CACHE_TIMEOUT)
+    else:
+        since = schedule['next']
+    crossed = Post.objects.filter(
+        is_published=True,
+        pub_date__gte=since,
+        pub_date__lte=now
+    )
+    with reading_from_primary():
+        recount(get_counter_keys(crossed))
+        bump(*get_feed_scopes(crossed))
+        schedule = build_schedule(now)
+    cache.set(key, schedule, settings.BLOG_CACHE_TIMEOUT)
+    return schedule
+
+
+def reset_schedule():
+    """Rebuild the schedule from the database after a post is published.
+
+    Workers publishing posts at the same time only bump the scope, so no
+    ``next`` pub_date is lost to a concurrent read-modify-write.
+    """
+    bump_on_commit(SCHEDULE_SCOPE)
+
+
+def visibility_now() -> datetime:
+    """Return moment to filter published posts by.
+
+    The value only changes once per bucket, so equal queries are shared
+    by all requests in between, or when a delayed post gets published:
+    no post has pub_date between the returned moment and the real now.
+    """
+    now = timezone.now()
+    moment = floor_to_bucket(now)
+    last = get_schedule(now)['last']
+    if last is not None and moment < last <= now:
+        return last
+    return moment
@@ -0,0 +1,103 @@
+import logging
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+logger = logging.getLogger('blog.writes')
+
+_write_lock = threading.RLock()
+_stats = {
+    'writes': 0,
+    'retries': 0,
+    'timeouts': 0,
+    'wait_total': 0.0,
+    'wait_max': 0.0,
+}
+_stats_lock = threading.Lock()
+_last_report = {'at': time.monotonic()}
+
+
+class WriteContention(Exception):
+    """Write did not get through within BLOG_WRITE_TIMEOUT."""
+
+
+def get_write_stats() -> dict:
+    """Return write contention totals of this process.
+
+    Every BLOG_WRITE_STATS_INTERVAL seconds the totals are also logged to
+    ``blog.writes``, where operators can follow all worker processes.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_write_stats():
+    with _stats_lock:
+        _stats.update(dict.fromkeys(_stats, 0))
+
+
+def _record(key: str, wait: float = 0.0):
+    now = time.monotonic()
+    with _stats_lock:
+        _stats[key] += 1
+        _stats['wait_total'] += wait
+        _stats['wait_max'] = max(_stats['wait_max'], wait)
+        report = (
+            now - _last_report['at'] >= settings.BLOG_WRITE_STATS_INTERVAL
+        )
+        if report:
+            _last_report['at'] = now
+            stats = dict(_stats, pid=os.getpid())
+    if report:
+        logger.info(
+            'Write stats of process %(pid)d: %(writes)d writes, '
+            '%(retries)d retries, %(timeouts)d timeouts, waited '
+            '%(wait_total).3f s in total, %(wait_max).3f s at most',
+            stats
+        )
+
+
+def is_database_locked(error: OperationalError) -> bool:
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def run_write(write):
+    """Run ``write`` in its own transaction, one write at a time.
+
+    Writes of this process wait for each other instead of racing for the
+    SQLite lock. The lock is per process: writes of different worker
+    processes are not serialized, they only retry "database is locked"
+    with exponential backoff. When BLOG_WRITE_TIMEOUT runs out,
+    WriteContention is raised.
+    """
+    started = time.monotonic()
+    deadline = started + settings.BLOG_WRITE_TIMEOUT
+    for attempt in range(settings.BLOG_WRITE_RETRIES + 1):
+        if not _write_lock.acquire(
+            timeout=max(deadline - time.monotonic(), 0)
+        ):
+            break
+        try:
+            with transaction.atomic():
+                result = write()
+        except OperationalError as error:
+            if not is_database_locked(error):
+                raise
+            _record('retries')
+            logger.warning('Write attempt %d: %s', attempt + 1, error)
+        else:
+            _record('writes', time.monotonic() - started)
+            return result
+        finally:
+            _write_lock.release()
+        backoff = settings.BLOG_WRITE_BACKOFF * 2 ** attempt
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(backoff * random.uniform(0.5, 1), remaining))
+    _record('timeouts', time.monotonic() - started)
+    raise WriteContention
@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.QueryBudgetMiddleware',
+    'blog.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.WriteContentionMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -84,6 +87,60 @@ DATABASES = {
     }
 }
 
+# Aliases of read-only copies of 'default' in DATABASES, e.g.
+#     'replica': {
+#         'ENGINE': 'django.db.backends.sqlite3',
+#         'NAME': BASE_DIR / 'replica.sqlite3',
+#         'TEST': {'MIRROR': 'default'},
+#     },
+# Reads go to a random replica, writes and reads of users who wrote in
+# the last BLOG_REPLICA_STICKY seconds go to 'default'. So do cached pages
+# and counts of cache scopes bumped in the last BLOG_REPLICA_STICKY seconds.
+BLOG_READ_REPLICAS = []
+BLOG_REPLICA_STICKY = 10
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Applied to every new SQLite connection, see blog.signals.set_sqlite_pragmas.
+# WAL lets readers work while a comment is being written; an empty dict
+# keeps SQLite defaults.
+BLOG_SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'memory',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Cache generations (blog.cache) and the publication schedule
+# (blog.visibility) must be shared by every worker process: a bump made
+# by the worker that saved a post has to reach the pages cached by the
+# others. The file cache is shared by the workers of one host; use
+# Memcached or Redis when running several hosts. LocMemCache is only
+# correct with a single process, see the blog.W001 check.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Cached feed pages are invalidated by content changes, the timeout only
+# bounds memory held by pages nobody requests anymore.
+BLOG_CACHE_TIMEOUT = 60 * 15
+
+# Published posts are filtered by "now" rounded down to this many seconds,
+# so feed queries repeat within a bucket. Delayed posts still appear on
+# time: the clock jumps to their pub_date as soon as it is reached.
+BLOG_VISIBILITY_BUCKET = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -139,5 +196,38 @@ LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 'pages' renders numbered ?page=N links, 'keyset' paginates post feeds
+# by (pub_date, id) cursors with constant cost per page.
+BLOG_PAGINATION = 'pages'
+
+# Per-request query monitoring, see blog.middleware.QueryBudgetMiddleware.
+# Violations are logged to the 'blog.queries' logger.
+BLOG_QUERY_MONITOR = False
+BLOG_QUERY_BUDGET = 20
+BLOG_QUERY_TIME_BUDGET = 0.5
+BLOG_QUERY_REPEATS = 3
+
+# Post and comment submissions go through blog.writes.run_write(): one
+# write at a time per process (processes only contend through SQLite),
+# retried with exponential backoff from BLOG_WRITE_BACKOFF seconds while
+# the database is locked. After BLOG_WRITE_TIMEOUT seconds the request
+# gets 503 with Retry-After. Every BLOG_WRITE_STATS_INTERVAL seconds each
+# process logs its contention totals to the 'blog.writes' logger.
+BLOG_WRITE_TIMEOUT = 10
+BLOG_WRITE_RETRIES = 8
+BLOG_WRITE_BACKOFF = 0.05
+BLOG_WRITE_STATS_INTERVAL = 60
+
+# Admin changelist search goes through the full-text indexes of
+# blog.search: at most BLOG_ADMIN_SEARCH_LIMIT newest matches found
+# within BLOG_ADMIN_SEARCH_BUDGET seconds are shown.
+BLOG_ADMIN_SEARCH_LIMIT = 500
+BLOG_ADMIN_SEARCH_BUDGET = 0.2
+
+# Category and location choices of the post form are loaded as the user
+# types, see blog.views.autocomplete.
+BLOG_AUTOCOMPLETE_LIMIT = 20
+BLOG_AUTOCOMPLETE_BUDGET = 0.1
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
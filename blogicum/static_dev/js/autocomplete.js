@@ -0,0 +1,37 @@
+// Fill selects with data-autocomplete-url from the endpoint as the user
+// types into the search box added above each of them.
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('select[data-autocomplete-url]').forEach(
+    (select) => {
+      const search = document.createElement('input');
+      search.type = 'search';
+      search.className = 'form-control form-control-sm mb-1';
+      search.placeholder = 'Начните вводить название';
+      select.before(search);
+      let timer;
+      search.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+          const url = new URL(select.dataset.autocompleteUrl, location.href);
+          url.searchParams.set('q', search.value);
+          const response = await fetch(url);
+          if (!response.ok) {
+            return;
+          }
+          const {results} = await response.json();
+          const chosen = select.selectedOptions[0];
+          select.querySelectorAll('option').forEach((option) => {
+            if (option.value && option !== chosen) {
+              option.remove();
+            }
+          });
+          results.forEach(({id, text}) => {
+            if (!chosen || String(id) !== chosen.value) {
+              select.add(new Option(text, id));
+            }
+          });
+        }, 250);
+      });
+    }
+  );
+});
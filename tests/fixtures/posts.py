@@ -5,9 +5,12 @@ from typing import Tuple
 import pytest
 from PIL import Image
 from django.core.files.images import ImageFile
+from django.db import connection
 from django.db.models import Model
 from django.forms import BaseForm
+from django.http import HttpResponse
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from mixer.backend.django import Mixer
 
@@ -141,3 +144,32 @@ def create_post_context_form_item(
         ),
     )
     return result
+
+
+@pytest.fixture
+def blend_posts(
+    mixer: Mixer, user, published_category, published_location
+):
+    """Return factory of visible posts published a day ago."""
+    def blend(count: int = 1, comments: int = 0, **fields):
+        posts = mixer.cycle(count).blend("blog.Post", **{
+            "author": user,
+            "category": published_category,
+            "location": published_location,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **fields,
+        })
+        for post in posts:
+            mixer.cycle(comments).blend("blog.Comment", post=post, author=user)
+        return posts
+    return blend
+
+
+def count_queries(
+    client: Client, url: str, method: str = "get", data: dict = None
+) -> Tuple[int, HttpResponse]:
+    """Return number of queries run by the request and its response."""
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data or {})
+    return len(context), response
@@ -0,0 +1,111 @@
+"""Fail tests whose requests repeat one query shape too many times.
+
+Queries are counted per request, between ``request_started`` and
+``request_finished``, so fixtures filling the database do not count.
+The limit is MAX_QUERY_REPEATS and can be changed for a single test with
+``@pytest.mark.max_query_repeats(n)``.
+"""
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from blog.middleware import get_query_template
+
+MAX_QUERY_REPEATS = 3
+
+
+def get_query_origin() -> list:
+    """Return template and project code lines that led to the query."""
+    lines = []
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        node = frame.f_locals.get('self')
+        if code.co_name == 'render_annotated' and hasattr(node, 'token'):
+            origin = getattr(node, 'origin', None)
+            lines.append(
+                f'  {origin.name if origin else "<template>"}:'
+                f'{node.token.lineno} {{% {node.token.contents} %}}'
+            )
+        elif Path(code.co_filename).is_relative_to(settings.BASE_DIR):
+            lines.append(
+                f'  {code.co_filename}:{frame.f_lineno} in {code.co_name}'
+            )
+        frame = frame.f_back
+    return lines
+
+
+class QueryRepeatsDetector:
+    """Execute wrapper collecting repeated queries of each request."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_request = False
+        self.templates = Counter()
+        self.violations = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.in_request:
+            template = get_query_template(sql)
+            self.templates[template] += 1
+            if self.templates[template] == self.limit + 1:
+                self.violations.append((
+                    self.path, template, get_query_origin()
+                ))
+        return execute(sql, params, many, context)
+
+    def start(self, environ=None, **kwargs):
+        self.in_request = True
+        self.path = (environ or {}).get('PATH_INFO', '')
+        self.templates.clear()
+
+    def finish(self, **kwargs):
+        self.in_request = False
+
+    def get_report(self) -> str:
+        return '\n\n'.join(
+            f'{path}: запрос выполнен больше {self.limit} раз:\n'
+            f'  {template}\n' + '\n'.join(origin)
+            for path, template, origin in self.violations
+        )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'max_query_repeats(n): allow one query shape n times per request'
+    )
+
+
+@pytest.fixture(autouse=True)
+def detect_query_repeats(request):
+    marker = request.node.get_closest_marker('max_query_repeats')
+    detector = QueryRepeatsDetector(
+        marker.args[0] if marker else MAX_QUERY_REPEATS
+    )
+    request_started.connect(detector.start)
+    request_finished.connect(detector.finish)
+    wrappers = [
+        connection.execute_wrappers for connection in connections.all()
+    ]
+    for execute_wrappers in wrappers:
+        execute_wrappers.append(detector)
+    try:
+        yield detector
+    finally:
+        request_started.disconnect(detector.start)
+        request_finished.disconnect(detector.finish)
+        for execute_wrappers in wrappers:
+            execute_wrappers.remove(detector)
+    if detector.violations:
+        pytest.fail(
+            'Убедитесь, что страницы не выполняют одинаковые запросы '
+            'к базе данных для каждого объекта (N+1):\n\n'
+            + detector.get_report(),
+            pytrace=False
+        )
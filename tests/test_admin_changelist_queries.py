@@ -0,0 +1,74 @@
+import pytest
+from django.core.cache import cache
+
+from fixtures.posts import count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELISTS = ("/admin/blog/post/", "/admin/blog/comment/")
+
+
+def count_changelist(client, url):
+    n_queries, response = count_queries(client, url)
+    assert response.status_code == 200
+    return n_queries, response.context["cl"].result_count
+
+
+def test_changelist_queries_do_not_grow_with_rows(admin_client, blend_posts):
+    counts = []
+    for rows in (2, 10):
+        blend_posts(rows, comments=1)
+        cache.clear()
+        counts.append(
+            [count_changelist(admin_client, url)[0] for url in CHANGELISTS]
+        )
+    few, many = counts
+    assert few == many, (
+        "Убедитесь, что число запросов страницы списка в админке не "
+        "зависит от числа строк на странице."
+    )
+
+
+def test_changelist_count_is_cached_until_change(admin_client, blend_posts):
+    blend_posts(2, comments=1)
+    first, count = count_changelist(admin_client, CHANGELISTS[0])
+    second, cached_count = count_changelist(admin_client, CHANGELISTS[0])
+    assert cached_count == count == 2
+    assert second < first, (
+        "Убедитесь, что счётчик списка публикаций в админке берётся "
+        "из кеша."
+    )
+    blend_posts(1, comments=1)
+    assert count_changelist(admin_client, CHANGELISTS[0])[1] == 3, (
+        "Убедитесь, что кешированный счётчик сбрасывается при изменении "
+        "публикаций."
+    )
+
+
+def test_related_filter_lists_only_found_rows(admin_client, mixer):
+    locations = [
+        mixer.blend("blog.Location", name=name)
+        for name in ("Санкт-Петербург", "Петрозаводск", "Москва")
+    ]
+    content = admin_client.get(CHANGELISTS[0]).content.decode()
+    assert 'name="location__q"' in content
+    assert not any(location.name in content for location in locations), (
+        "Убедитесь, что фильтр по местоположению в админке не загружает "
+        "все местоположения."
+    )
+    response = admin_client.get(CHANGELISTS[0], {
+        "location__q": "пет",
+        "location__id__exact": locations[2].pk,
+    })
+    assert response.status_code == 200
+    spec = next(
+        spec for spec in response.context["cl"].filter_specs
+        if spec.field_path == "location"
+    )
+    assert sorted(name for _, name in spec.lookup_choices) == [
+        "Москва", "Петрозаводск", "Санкт-Петербург"
+    ], (
+        "Убедитесь, что фильтр по местоположению предлагает найденные "
+        "по началу слов и выбранное местоположение."
+    )
+    assert response.context["cl"].result_count == 0
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_results(admin_client, model, query):
+    response = admin_client.get(f"/admin/blog/{model}/", {"q": query})
+    assert response.status_code == 200
+    return response, set(response.context["cl"].result_list)
+
+
+def test_admin_search_matches_word_prefixes(admin_client, mixer, user):
+    found = mixer.blend(
+        "blog.Post", author=user, title="Горные походы", text="Рюкзак"
+    )
+    mixer.blend("blog.Post", author=user, title="Море", text="Горизонт")
+    comment = mixer.blend("blog.Comment", post=found, text="Отличный поход")
+    category = mixer.blend(
+        "blog.Category", title="Путешествия", slug="travel"
+    )
+    _, posts = get_results(admin_client, "post", "горн рюкз")
+    assert posts == {found}, (
+        "Убедитесь, что поиск в админке находит публикации по началу "
+        "слов заголовка и текста."
+    )
+    _, comments = get_results(admin_client, "comment", "поход")
+    assert comments == {comment}
+    _, categories = get_results(admin_client, "category", "путеш")
+    assert categories == {category}
+
+
+def test_admin_search_falls_back_to_like(admin_client, mixer, user):
+    location = mixer.blend("blog.Location", name="Санкт-Петербург")
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE blog_location_search")
+    _, locations = get_results(admin_client, "location", "бург")
+    assert locations == {location}, (
+        "Убедитесь, что без поискового индекса админка ищет по "
+        "`search_fields`."
+    )
+
+
+def test_admin_search_stops_at_budget(
+        admin_client, mixer, user, settings, monkeypatch
+):
+    mixer.blend("blog.Post", author=user, title="Поход", text="Текст")
+    settings.BLOG_ADMIN_SEARCH_BUDGET = 0
+    monkeypatch.setattr("blog.search.PROGRESS_STEPS", 1)
+    response, posts = get_results(admin_client, "post", "поход")
+    assert not posts
+    assert "Показаны не все совпадения" in response.content.decode(), (
+        "Убедитесь, что админка предупреждает о прерванном по времени "
+        "поиске."
+    )
@@ -0,0 +1,49 @@
+import pytest
+
+from blog.models import Comment
+from fixtures.posts import count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+# Session and user of the request are two of the queries.
+QUERY_BUDGETS = (
+    ("get", "/posts/{post}/edit/", 5),
+    ("get", "/posts/{post}/delete/", 3),
+    ("get", "/posts/{post}/edit_comment/{comment}/", 3),
+    ("post", "/posts/{post}/edit_comment/{comment}/", 6),
+    ("get", "/posts/{post}/delete_comment/{comment}/", 3),
+    ("post", "/posts/{post}/delete_comment/{comment}/", 6),
+)
+FORM_DATA = {"text": "Новый текст"}
+
+
+@pytest.fixture
+def comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        Comment, post=post_with_published_location, author=user
+    )
+
+
+def test_author_views_stay_within_budget(
+        user_client, post_with_published_location, comment):
+    for method, url, budget in QUERY_BUDGETS:
+        url = url.format(post=post_with_published_location.id,
+                         comment=comment.id)
+        n_queries, response = count_queries(
+            user_client, url, method, FORM_DATA
+        )
+        assert response.status_code in (200, 302)
+        assert n_queries <= budget, (
+            f"Убедитесь, что {method.upper()}-запрос к `{url}` выполняет "
+            f"не больше {budget} запросов к базе данных, а не {n_queries}. "
+            "Объект должен загружаться один раз вместе с автором."
+        )
+
+
+def test_not_author_is_checked_with_one_object_query(
+        another_user_client, post_with_published_location, comment):
+    url = (f"/posts/{post_with_published_location.id}"
+           f"/edit_comment/{comment.id}/")
+    n_queries, response = count_queries(another_user_client, url)
+    assert response.status_code == 403
+    assert n_queries == 3
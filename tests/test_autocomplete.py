@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def locations(mixer):
+    return [
+        mixer.blend("blog.Location", name=name)
+        for name in ("Санкт-Петербург", "Петрозаводск", "Москва")
+    ]
+
+
+def test_post_form_renders_only_chosen_options(
+        user_client, mixer, user, locations):
+    post = mixer.blend("blog.Post", author=user, location=locations[0])
+    content = user_client.get("/posts/create/").content.decode()
+    assert 'data-autocomplete-url="/autocomplete/location/"' in content
+    assert not any(location.name in content for location in locations), (
+        "Убедитесь, что форма публикации не загружает все местоположения."
+    )
+    content = user_client.get(f"/posts/{post.id}/edit/").content.decode()
+    assert locations[0].name in content, (
+        "Убедитесь, что форма редактирования показывает выбранное "
+        "местоположение."
+    )
+    assert locations[2].name not in content
+
+
+def test_autocomplete_matches_word_prefixes(user_client, locations):
+    response = user_client.get("/autocomplete/location/", {"q": "пет"})
+    assert response.status_code == HTTPStatus.OK
+    assert [item["text"] for item in response.json()["results"]] == [
+        "Петрозаводск", "Санкт-Петербург"
+    ], (
+        "Убедитесь, что автодополнение находит местоположения по началу "
+        "слов названия."
+    )
+
+
+def test_autocomplete_access(client, user_client):
+    assert client.get("/autocomplete/location/").status_code == (
+        HTTPStatus.FOUND
+    )
+    assert user_client.get("/autocomplete/user/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_post_admin_uses_autocomplete(admin_client, locations):
+    assert admin_client.get("/admin/blog/post/add/").status_code == (
+        HTTPStatus.OK
+    )
+    response = admin_client.get("/admin/autocomplete/", {
+        "app_label": "blog",
+        "model_name": "post",
+        "field_name": "location",
+        "term": "моск",
+    })
+    assert [item["text"] for item in response.json()["results"]] == [
+        "Москва"
+    ]
@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_stored_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_counter_follows_comments(
+        mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    assert get_stored_count(post) == 0
+    comments = mixer.cycle(3).blend(Comment, post=post, author=another_user)
+    assert get_stored_count(post) == 3, (
+        "Убедитесь, что счётчик комментариев увеличивается при добавлении "
+        "комментария."
+    )
+    comments[0].delete()
+    assert get_stored_count(post) == 2
+    another_user.delete()
+    assert get_stored_count(post) == 0, (
+        "Убедитесь, что счётчик комментариев уменьшается при каскадном "
+        "удалении комментариев."
+    )
+
+
+def test_counter_moves_with_comment(
+        mixer, user, post_with_published_location, post_of_another_author):
+    comment = mixer.blend(
+        Comment, post=post_with_published_location, author=user
+    )
+    comment.post = post_of_another_author
+    comment.save()
+    assert get_stored_count(post_with_published_location) == 0
+    assert get_stored_count(post_of_another_author) == 1
+
+
+def test_repair_comment_counts(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=10)
+    call_command("repair_comment_counts", "--dry-run")
+    assert get_stored_count(post) == 10
+    call_command("repair_comment_counts")
+    assert get_stored_count(post) == 2
+
+
+def test_drifted_counter_does_not_go_negative(
+        mixer, user, post_with_published_location):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text="Текст") for _ in range(2)
+    )
+    Comment.objects.first().delete()
+    assert get_stored_count(post) == 0, (
+        "Убедитесь, что счётчик комментариев не становится отрицательным."
+    )
+    post.delete()
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.parametrize("count", (1, 10))
+def test_post_delete_skips_comment_bookkeeping(
+        mixer, user, post_with_published_location, count):
+    post = post_with_published_location
+    mixer.cycle(count).blend(Comment, post=post, author=user)
+    with CaptureQueriesContext(connection) as context:
+        post.delete()
+    updates = [
+        query for query in context.captured_queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ]
+    assert not updates, (
+        "Убедитесь, что при удалении публикации счётчик комментариев не "
+        "обновляется для каждого удаляемого комментария."
+    )
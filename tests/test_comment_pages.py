@@ -0,0 +1,57 @@
+import pytest
+
+from blog.models import Comment
+from blog.views import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, user, post_with_published_location):
+    return mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        Comment, post=post_with_published_location, author=user
+    )
+
+
+def test_comments_are_paginated(
+        client, post_with_published_location, many_comments):
+    post = post_with_published_location
+    response = client.get(f"/posts/{post.id}/")
+    first_page = response.context["comments"]
+    assert len(first_page) == COMMENTS_PER_PAGE, (
+        "Убедитесь, что на странице публикации выводится только первая "
+        "страница комментариев."
+    )
+    assert first_page.has_next()
+    next_url = f"/posts/{post.id}/comments/?after={first_page.next_cursor}"
+    assert next_url in response.content.decode()
+
+    fragment = client.get(next_url)
+    assert fragment.status_code == 200
+    rest = fragment.context["comments"]
+    assert not rest.has_next()
+    assert [c.pk for c in first_page] + [c.pk for c in rest] == [
+        c.pk for c in many_comments
+    ]
+    assert "<html" not in fragment.content.decode()
+
+
+def test_comments_fragment_hides_unpublished_post(
+        another_user_client, post_with_published_location, many_comments):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == 404
+
+
+def test_out_of_range_comment_cursor_is_ignored(
+        user_client, post_with_published_location):
+    response = user_client.get(
+        f"/posts/{post_with_published_location.id}/comments/",
+        {"after": "1.99999999999999999999999"}
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что курсор с id вне допустимого диапазона не приводит "
+        "к ошибке сервера."
+    )
@@ -0,0 +1,46 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(blend_posts, another_category):
+    return [
+        *blend_posts(title="Первая, с запятой"),
+        *blend_posts(title="Вторая"),
+        *blend_posts(title="Третья", category=another_category),
+    ]
+
+
+def test_admin_action_streams_csv(admin_client, posts):
+    response = admin_client.post("/admin/blog/post/", {
+        "action": "export_csv",
+        "_selected_action": [post.pk for post in posts[:2]],
+    })
+    assert response.streaming, (
+        "Убедитесь, что выгрузка из админки отдаётся потоком."
+    )
+    rows = list(csv.DictReader(
+        StringIO(b"".join(response.streaming_content).decode())
+    ))
+    assert sorted(row["title"] for row in rows) == sorted(
+        post.title for post in posts[:2]
+    )
+
+
+def test_command_exports_filtered_jsonl(posts, another_category):
+    out = StringIO()
+    call_command(
+        "export_blog", "post", format="jsonl",
+        filters=[f"category__slug={another_category.slug}"], stdout=out
+    )
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row["id"] for row in rows] == [posts[2].pk], (
+        "Убедитесь, что команда выгружает только отфильтрованные строки."
+    )
+    assert rows[0]["author__username"] == posts[2].author.username
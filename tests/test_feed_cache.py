@@ -0,0 +1,148 @@
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+
+from blog.cache import (
+    GENERATION_KEY, INDEX_SCOPE, author_scope, bump, category_scope,
+    changelist_scope, check_shared_cache, get_generations, post_scope)
+from blog.models import Comment, Post
+from fixtures.posts import count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_page_is_cached(client, post_with_published_location):
+    first = count_queries(client, "/")[0]
+    assert count_queries(client, "/")[0] < first, (
+        "Убедитесь, что повторный запрос ленты берёт публикации из кэша."
+    )
+
+
+def test_comment_invalidates_only_affected_feeds(
+        mixer, user, post_with_published_location, another_category):
+    post = post_with_published_location
+    affected = (
+        INDEX_SCOPE,
+        category_scope(post.category.slug),
+        author_scope(post.author.username),
+    )
+    untouched = (category_scope(another_category.slug),)
+    before = get_generations(affected + untouched)
+    mixer.blend(Comment, post=post, author=user)
+    after = get_generations(affected + untouched)
+    assert all(b != a for b, a in zip(before[:3], after[:3]))
+    assert before[3:] == after[3:]
+
+
+def test_comment_edit_keeps_feeds(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend(Comment, post=post, author=user)
+    scopes = (
+        INDEX_SCOPE,
+        category_scope(post.category.slug),
+        author_scope(post.author.username),
+        post_scope(post.pk),
+    )
+    before = get_generations(scopes + (changelist_scope("comment"),))
+    comment.text = "Исправленный текст"
+    comment.save()
+    after = get_generations(scopes + (changelist_scope("comment"),))
+    assert before[:4] == after[:4], (
+        "Убедитесь, что правка текста комментария не сбрасывает кеш лент."
+    )
+    assert before[4] != after[4]
+
+
+def test_unpublished_category_drops_cached_index(
+        client, post_with_published_location):
+    post = post_with_published_location
+    assert post in client.get("/").context["page_obj"]
+    post.category.is_published = False
+    post.category.save()
+    assert post not in client.get("/").context["page_obj"], (
+        "Убедитесь, что снятие категории с публикации сбрасывает кэш ленты."
+    )
+
+
+@pytest.mark.parametrize(
+    "url", ["/", "/category/{slug}/", "/profile/{username}/"]
+)
+def test_anonymous_page_is_served_from_cache(
+        client, user_client, post_with_published_location, url):
+    post = post_with_published_location
+    url = url.format(slug=post.category.slug, username=post.author.username)
+    client.get(url)
+    assert count_queries(client, url)[0] == 0, (
+        "Убедитесь, что анонимному посетителю страница отдаётся из кэша "
+        "без запросов к базе данных."
+    )
+    assert count_queries(user_client, url)[0] > 0
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in client.get(url).content.decode()
+
+
+def test_post_card_is_shared_and_invalidated(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    urls = ("/", f"/category/{post.category.slug}/",
+            f"/profile/{post.author.username}/")
+    keys = {
+        url: next(iter(user_client.get(url).context["page_obj"])).card_key
+        for url in urls
+    }
+    assert len(set(keys.values())) == 1, (
+        "Убедитесь, что карточка публикации кэшируется одна на все ленты."
+    )
+    post.location.name = "Новое место"
+    post.location.save()
+    content = user_client.get("/").content.decode()
+    assert "Новое место" in content
+
+
+def test_feed_count_is_shared_between_pages(
+        user_client, many_posts_with_published_locations):
+    user_client.get("/?page=1")
+    with CaptureQueriesContext(connection) as context:
+        user_client.get("/?page=2")
+    assert not any("COUNT(" in query["sql"] for query in context), (
+        "Убедитесь, что число публикаций ленты считается один раз "
+        "для всех её страниц."
+    )
+
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    page_obj = user_client.get("/?page=2").context["page_obj"]
+    assert page_obj.paginator.count == Post.objects.filter(
+        is_published=True, pub_date__lte=timezone.now()
+    ).count()
+
+
+@pytest.fixture
+def file_cache(settings, tmp_path):
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(tmp_path),
+    }}
+    return tmp_path
+
+
+def test_generations_are_shared_between_processes(file_cache):
+    other_worker = FileBasedCache(str(file_cache), {})
+    before = get_generations([INDEX_SCOPE])[0]
+    bump(INDEX_SCOPE)
+    assert other_worker.get(GENERATION_KEY.format(INDEX_SCOPE)) != before, (
+        "Убедитесь, что сброс кеша виден другим процессам."
+    )
+
+
+def test_local_memory_cache_is_reported(settings, file_cache):
+    assert not check_shared_cache(None)
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+    }}
+    assert [error.id for error in check_shared_cache(None)] == ["blog.W001"]
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.views import PAGES_ON_EACH_SIDE, PAGES_ON_ENDS
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_page_range_is_elided(mixer, client, user, published_category):
+    n_pages = 20
+    mixer.cycle(N_PER_PAGE * n_pages).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    response = client.get("/?page=10")
+    page_obj = response.context["page_obj"]
+    numbers = [i for i in page_obj.page_range if isinstance(i, int)]
+    assert len(numbers) == 2 * PAGES_ON_EACH_SIDE + 1 + 2 * PAGES_ON_ENDS, (
+        "Убедитесь, что пагинатор выводит только первые, последние и "
+        "соседние с текущей страницы."
+    )
+    content = response.content.decode()
+    assert f'href="?page={n_pages}"' in content
+    assert 'href="?page=5"' not in content
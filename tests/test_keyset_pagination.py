@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.paginators import KeysetPaginator, decode_cursor, encode_cursor
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def same_time_posts(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_date,
+    )
+
+
+def test_cursor_roundtrip():
+    moment = timezone.now()
+    assert decode_cursor(encode_cursor(moment, 42)) == (moment, 42)
+    assert decode_cursor("garbage") is None
+
+
+@pytest.mark.parametrize("cursor", ("1.99999999999999999999999", "1.0"))
+def test_out_of_range_cursor_is_ignored(client, same_time_posts, cursor):
+    assert decode_cursor(cursor) is None
+    response = client.get("/", {"after": cursor})
+    assert response.status_code == 200, (
+        "Убедитесь, что курсор с id вне допустимого диапазона не приводит "
+        "к ошибке сервера."
+    )
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+
+
+def test_keyset_pages_cover_all_posts(same_time_posts):
+    from blog.models import Post
+
+    paginator = KeysetPaginator(Post.objects.all(), N_PER_PAGE)
+    seen = []
+    page = paginator.get_page()
+    assert not page.has_previous()
+    while True:
+        seen.extend(post.pk for post in page)
+        if not page.has_next():
+            break
+        page = paginator.get_page(after=page.next_cursor)
+    assert sorted(seen, reverse=True) == seen, (
+        "Убедитесь, что при курсорной пагинации порядок публикаций "
+        "стабилен для одинаковой даты публикации."
+    )
+    assert len(set(seen)) == len(same_time_posts)
+
+    previous = paginator.get_page(before=page.previous_cursor)
+    assert [post.pk for post in previous] == seen[
+        -len(page) - N_PER_PAGE:-len(page)
+    ]
+
+
+def test_keyset_links_rendered(client, same_time_posts):
+    response = client.get("/?after=")
+    page_obj = response.context["page_obj"]
+    assert len(page_obj) == N_PER_PAGE
+    assert f"?after={page_obj.next_cursor}" in response.content.decode()
+    response = client.get(f"/?after={page_obj.next_cursor}")
+    assert response.status_code == 200
+    assert response.context["page_obj"].has_previous()
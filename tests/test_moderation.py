@@ -0,0 +1,111 @@
+import pytest
+from django.contrib.admin.models import DELETION, LogEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.counters import get_posts_count
+from blog.models import Comment, Post, PostCounter
+from blog.search import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def run_action(client, model, action, objects):
+    return client.post(f"/admin/blog/{model}/", {
+        "action": action,
+        "_selected_action": [obj.pk for obj in objects],
+        "post": "yes",
+    })
+
+
+def test_unpublish_posts_in_batch(admin_client, blend_posts):
+    queries = []
+    # The first request also caches the changelist count.
+    for count in (1, 2, 12):
+        posts = blend_posts(count, title="Поход")
+        with CaptureQueriesContext(connection) as context:
+            run_action(admin_client, "post", "unpublish", posts)
+        queries.append(len(context))
+    assert queries[1] == queries[2], (
+        "Убедитесь, что снятие публикаций с публикации в админке "
+        "выполняется одинаковым числом запросов для любого числа строк."
+    )
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert get_posts_count(PostCounter.INDEX) == 0, (
+        "Убедитесь, что действие админки пересчитывает счётчики публикаций."
+    )
+    run_action(admin_client, "post", "publish", posts)
+    assert get_posts_count(PostCounter.INDEX) == 12
+
+
+def test_delete_posts_in_batch(admin_client, blend_posts, mixer, user):
+    posts = blend_posts(3, title="Поход")
+    mixer.cycle(2).blend("blog.Comment", post=posts[0], author=user)
+    run_action(admin_client, "post", "delete_selected", posts[:2])
+    assert list(Post.objects.all()) == [posts[2]]
+    assert not Comment.objects.exists()
+    assert get_posts_count(PostCounter.AUTHOR, user.pk) == 1
+    assert len(search_posts("поход", timezone.now(), 10)) == 1
+
+
+def test_delete_posts_with_constant_queries(admin_client, blend_posts):
+    queries = []
+    # The first request also caches the changelist count.
+    for count in (1, 2, 20):
+        posts = blend_posts(count, title="Поход")
+        with CaptureQueriesContext(connection) as context:
+            run_action(admin_client, "post", "delete_selected", posts)
+        queries.append(len(context))
+    assert queries[1] == queries[2], (
+        "Убедитесь, что удаление публикаций в админке выполняется "
+        "одинаковым числом запросов для любого числа строк."
+    )
+    assert not Post.objects.exists()
+    assert LogEntry.objects.filter(action_flag=DELETION).count() == 23, (
+        "Убедитесь, что удаление в админке записывается в журнал "
+        "действий для каждой строки."
+    )
+
+
+def test_delete_confirmation_shows_only_count(admin_client, blend_posts):
+    posts = blend_posts(3, title="Поход")
+    response = admin_client.post("/admin/blog/post/", {
+        "action": "delete_selected",
+        "_selected_action": [post.pk for post in posts],
+    })
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "будут удалены: 3." in content, (
+        "Убедитесь, что страница подтверждения удаления показывает "
+        "число удаляемых строк."
+    )
+    assert "Поход" not in content
+    assert Post.objects.count() == 3
+
+
+def test_delete_comments_recounts_posts(admin_client, blend_posts, mixer,
+                                        user):
+    post = blend_posts(1)[0]
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    run_action(admin_client, "comment", "delete_selected", comments[:2])
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что удаление комментариев в админке обновляет "
+        "счётчик комментариев публикации."
+    )
+
+
+def test_category_actions_update_posts(
+        admin_client, blend_posts, published_category):
+    posts = blend_posts(2)
+    run_action(admin_client, "category", "unpublish", [published_category])
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert get_posts_count(
+        PostCounter.CATEGORY, published_category.pk
+    ) == 0
+    run_action(
+        admin_client, "category", "delete_selected", [published_category]
+    )
+    assert set(Post.objects.filter(category=None)) == set(posts)
+    assert get_posts_count(PostCounter.INDEX) == 0
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.counters import get_posts_count
+from blog.models import PostCounter
+from blog.visibility import visibility_now
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_stored(kind, object_id=0):
+    return PostCounter.objects.values_list("posts_count", flat=True).get(
+        kind=kind, object_id=object_id
+    )
+
+
+def test_counters_follow_posts(
+        mixer, user, published_category, another_category):
+    assert get_posts_count(PostCounter.INDEX) == 0
+    posts = mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert get_stored(PostCounter.INDEX) == 3
+    assert get_stored(PostCounter.CATEGORY, published_category.pk) == 3, (
+        "Убедитесь, что счётчик публикаций категории обновляется при "
+        "создании публикации."
+    )
+    assert get_stored(PostCounter.AUTHOR, user.pk) == 3
+
+    posts[0].is_published = False
+    posts[0].save()
+    posts[1].category = another_category
+    posts[1].save()
+    posts[2].delete()
+    assert get_stored(PostCounter.INDEX) == 1
+    assert get_stored(PostCounter.CATEGORY, published_category.pk) == 0
+    assert get_stored(PostCounter.CATEGORY, another_category.pk) == 1, (
+        "Убедитесь, что счётчики обновляются при переносе публикации в "
+        "другую категорию."
+    )
+    assert get_stored(PostCounter.AUTHOR, user.pk) == 1
+    assert get_stored(PostCounter.AUTHOR_ALL, user.pk) == 2
+
+    another_category.is_published = False
+    another_category.save()
+    assert get_stored(PostCounter.INDEX) == 0, (
+        "Убедитесь, что снятие категории с публикации обновляет счётчики."
+    )
+
+
+def test_counter_follows_pub_date(mixer, user, published_category):
+    now = timezone.now()
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=now + timedelta(minutes=5),
+    )
+    visibility_now()
+    assert get_posts_count(PostCounter.CATEGORY, published_category.pk) == 0
+    later = now + timedelta(minutes=10)
+    with mock.patch("django.utils.timezone.now", return_value=later):
+        visibility_now()
+    assert get_stored(PostCounter.CATEGORY, published_category.pk) == 1, (
+        "Убедитесь, что отложенная публикация учитывается в счётчиках, "
+        "когда наступает её дата публикации."
+    )
+
+
+def test_paginator_reads_counter(
+        client, mixer, user, published_category):
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    PostCounter.objects.update_or_create(
+        kind=PostCounter.INDEX, object_id=0, defaults={"posts_count": 42}
+    )
+    response = client.get("/")
+    assert response.context["page_obj"].paginator.count == 42
+    call_command("recount_posts")
+    assert get_stored(PostCounter.INDEX) == 1
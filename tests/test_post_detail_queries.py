@@ -0,0 +1,49 @@
+import pytest
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+DETAIL_QUERIES_ANONYMOUS = 2
+
+
+def count_detail_queries(client, post):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.parametrize("n_comments", [1, 15])
+def test_detail_queries_do_not_depend_on_comments(
+        mixer, unlogged_client, user_client, another_user,
+        post_with_published_location, n_comments):
+    post = post_with_published_location
+    for _ in range(n_comments):
+        mixer.blend(Comment, post=post, author=mixer.blend("auth.User"))
+    # The first request builds the publication schedule.
+    count_detail_queries(unlogged_client, post)
+    assert count_detail_queries(
+        unlogged_client, post
+    ) == DETAIL_QUERIES_ANONYMOUS, (
+        "Убедитесь, что страница публикации загружает пост, автора, "
+        "категорию, местоположение и комментарии с их авторами "
+        "фиксированным числом запросов."
+    )
+    anonymous = count_detail_queries(unlogged_client, post)
+    logged_in = count_detail_queries(user_client, post)
+    assert logged_in - anonymous == 2, (
+        "Авторизованному пользователю нужны только запросы сессии "
+        "и пользователя."
+    )
+
+
+def test_hidden_post_is_visible_only_to_author(
+        user_client, another_user_client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200
+    assert another_user_client.get(f"/posts/{post.id}/").status_code == 404
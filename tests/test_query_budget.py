@@ -0,0 +1,62 @@
+import logging
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.middleware import (
+    QueryBudgetMiddleware, get_query_stats, get_query_template,
+    reset_query_stats
+)
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def monitor(settings):
+    settings.BLOG_QUERY_MONITOR = True
+    reset_query_stats()
+    yield settings
+    reset_query_stats()
+
+
+def test_query_template_collapses_in_lists():
+    assert get_query_template("id IN (%s, %s, %s)") == get_query_template(
+        "id IN (%s, %s)"
+    )
+
+
+def test_repeated_queries_are_logged(monitor, caplog):
+    monitor.BLOG_QUERY_REPEATS = 2
+
+    def view(request):
+        for pk in range(3):
+            Post.objects.filter(pk=pk).first()
+        return HttpResponse()
+
+    with caplog.at_level(logging.WARNING, logger="blog.queries"):
+        QueryBudgetMiddleware(view)(RequestFactory().get("/"))
+    assert any(
+        "N+1" in message and "blog_post" in message
+        for message in caplog.messages
+    ), (
+        "Убедитесь, что повторяющийся запрос попадает в лог вместе с его "
+        "шаблоном."
+    )
+
+
+def test_stats_are_kept_by_url_name(monitor, client, caplog):
+    monitor.BLOG_QUERY_BUDGET = 0
+    with caplog.at_level(logging.WARNING, logger="blog.queries"):
+        client.get("/")
+    stats = get_query_stats()["blog:index"]
+    assert stats["requests"] == 1
+    assert stats["queries"] > 0
+    assert "blog:index" in caplog.text
+
+
+def test_middleware_is_opt_in(client):
+    reset_query_stats()
+    client.get("/")
+    assert get_query_stats() == {}
@@ -0,0 +1,32 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.management.commands.check_query_plans import (
+    CURSOR_MOMENT, KEYSET_QUERIES, explain, find_plan_problems,
+    find_seek_params, get_view_queries)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_view_queries_use_indexes():
+    for name, queryset in get_view_queries().items():
+        plan = explain(queryset)
+        assert not find_plan_problems(plan), (
+            f"Убедитесь, что основной запрос `{name}` использует индекс, "
+            f"а не полный просмотр таблицы с сортировкой:\n{plan}"
+        )
+
+
+def test_keyset_queries_seek_to_cursor():
+    cursor_param = connection.ops.adapt_datetimefield_value(CURSOR_MOMENT)
+    queries = get_view_queries()
+    for name in KEYSET_QUERIES:
+        assert cursor_param in find_seek_params(queries[name]), (
+            f"Убедитесь, что запрос `{name}` начинает просмотр индекса "
+            "с курсора страницы."
+        )
+
+
+def test_check_query_plans_command():
+    call_command("check_query_plans")
@@ -0,0 +1,29 @@
+import pytest
+from django.template import Context, Template
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_detector_reports_template_line(
+        mixer, user, detect_query_repeats):
+    mixer.cycle(5).blend("blog.Post", author=user)
+    template = Template(
+        "{% for post in posts %}\n{{ post.author.username }}{% endfor %}"
+    )
+    detect_query_repeats.start()
+    template.render(Context({"posts": Post.objects.all()}))
+    detect_query_repeats.finish()
+    report = detect_query_repeats.get_report()
+    detect_query_repeats.violations.clear()
+    assert "auth_user" in report
+    assert ":2 " in report, (
+        "Убедитесь, что отчёт о повторяющихся запросах указывает строку "
+        "шаблона, которая их выполняет."
+    )
+
+
+@pytest.mark.max_query_repeats(10)
+def test_limit_is_set_by_marker(detect_query_repeats):
+    assert detect_query_repeats.limit == 10
@@ -0,0 +1,89 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.cache import bump, get_or_build
+from blog.middleware import PRIMARY_COOKIE, ReplicaStickinessMiddleware
+from blog.models import Post
+from blog.routers import PRIMARY_DB, ReplicaRouter, use_primary
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.BLOG_READ_REPLICAS = ["replica"]
+    settings.BLOG_REPLICA_STICKY = 10
+    monkeypatch.setattr(
+        "blog.middleware.connections", [PRIMARY_DB, "replica"]
+    )
+    return ReplicaRouter()
+
+
+def run_request(router, write=False, cookies=None):
+    seen = {}
+
+    def view(request):
+        seen["before"] = router.db_for_read(Post)
+        if write:
+            router.db_for_write(Post)
+        seen["after"] = router.db_for_read(Post)
+        return HttpResponse()
+
+    request = RequestFactory().post("/")
+    request.COOKIES.update(cookies or {})
+    response = ReplicaStickinessMiddleware(view)(request)
+    return seen, response
+
+
+def test_reads_go_to_replica(replicas):
+    seen, response = run_request(replicas)
+    assert seen == {"before": "replica", "after": "replica"}
+    assert PRIMARY_COOKIE not in response.cookies
+
+
+def test_writer_reads_from_primary(replicas):
+    seen, response = run_request(replicas, write=True)
+    assert seen == {"before": "replica", "after": PRIMARY_DB}, (
+        "Убедитесь, что после записи чтение в том же запросе идёт "
+        "в основную базу данных."
+    )
+    assert response.cookies[PRIMARY_COOKIE]["max-age"] == 10
+    outside = use_primary.get()
+    seen, _ = run_request(replicas, cookies={PRIMARY_COOKIE: "1"})
+    assert seen["before"] == PRIMARY_DB, (
+        "Убедитесь, что пользователь, который только что написал пост или "
+        "комментарий, читает данные из основной базы."
+    )
+    assert use_primary.get() == outside
+
+
+def test_router_without_replicas(settings):
+    settings.BLOG_READ_REPLICAS = []
+    assert ReplicaRouter().db_for_read(Post) == PRIMARY_DB
+    assert ReplicaRouter().allow_migrate("default", "blog") is None
+
+
+def test_changed_values_are_built_from_primary(replicas):
+    seen = []
+
+    def build():
+        seen.append(replicas.db_for_read(Post))
+        return len(seen)
+
+    def view(request):
+        get_or_build("test", ("scope",), (), build)
+        seen.append(replicas.db_for_read(Post))
+        return HttpResponse()
+
+    ReplicaStickinessMiddleware(view)(RequestFactory().get("/"))
+    assert seen == ["replica", "replica"], (
+        "Убедитесь, что данные неизменённых областей кеша читаются "
+        "из реплики."
+    )
+    bump("scope")
+    seen.clear()
+    ReplicaStickinessMiddleware(view)(RequestFactory().get("/"))
+    assert seen == [PRIMARY_DB, "replica"], (
+        "Убедитесь, что данные для общего кеша, изменённые в последние "
+        "BLOG_REPLICA_STICKY секунд, читаются из основной базы, а "
+        "остальные чтения по-прежнему идут в реплику."
+    )
@@ -0,0 +1,96 @@
+from unittest import mock
+
+import pytest
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import decode_search_cursor, get_match_query, search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_match_query_quotes_input():
+    assert get_match_query('кот" OR NEAR(пёс*') == '"кот" "OR" "NEAR" "пёс"*'
+    assert get_match_query("  ") == ""
+
+
+def test_search_ranks_and_filters(blend_posts):
+    [in_title] = blend_posts(title="Горные походы", text="Про рюкзаки.")
+    [in_text] = blend_posts(
+        title="Заметки", text="Однажды в походе мы видели горы."
+    )
+    blend_posts(
+        title="Походы тайком", text="Горы и походы", is_published=False
+    )
+    blend_posts(title="Про море", text="Ничего общего.")
+    page = search_posts("поход*", timezone.now(), 10)
+    assert [post.pk for post in page] == [in_title.pk, in_text.pk], (
+        "Убедитесь, что поиск находит только видимые публикации и ставит "
+        "совпадения в заголовке выше совпадений в тексте."
+    )
+    assert "<mark>походы</mark>" in page[0].search_title
+    assert "<mark>походе</mark>" in page[1].search_snippet
+
+
+def test_index_follows_edits_and_deletes(blend_posts):
+    [post] = blend_posts(title="Старый заголовок", text="Текст")
+    post.title = "Новый заголовок"
+    post.save()
+    now = timezone.now()
+    assert not list(search_posts("старый", now, 10))
+    assert [p.pk for p in search_posts("новый", now, 10)] == [post.pk]
+    post.delete()
+    assert not list(search_posts("новый", now, 10))
+
+
+def test_search_pages_by_cursor(blend_posts):
+    created = blend_posts(5, title="Поход", text="текст")
+    seen = []
+    page = search_posts("поход", timezone.now(), 2)
+    while True:
+        seen.extend(post.pk for post in page)
+        if not page.has_next():
+            break
+        page = search_posts(
+            "поход", timezone.now(), 2, after=page.next_cursor
+        )
+    assert sorted(seen) == sorted(post.pk for post in created)
+
+
+def test_snippet_is_escaped(client, blend_posts):
+    blend_posts(title="Поход", text="<script>alert(1)</script> поход")
+    content = client.get("/search/", {"q": "поход"}).content.decode()
+    assert "<script>alert(1)" not in content, (
+        "Убедитесь, что текст публикации в результатах поиска экранируется."
+    )
+    assert "<mark>" in content
+
+
+@pytest.mark.parametrize(
+    "cursor", ("1.0~99999999999999999999999", "nan~1", "inf~1")
+)
+def test_malformed_search_cursor_is_ignored(client, blend_posts, cursor):
+    blend_posts(title="Поход", text="текст")
+    assert decode_search_cursor(cursor) is None
+    response = client.get("/search/", {"q": "поход", "after": cursor})
+    assert response.status_code == 200, (
+        "Убедитесь, что некорректный курсор поиска не приводит к ошибке "
+        "сервера."
+    )
+
+
+def test_post_deleted_during_search_is_skipped(blend_posts):
+    deleted, kept = blend_posts(2, title="Поход", text="текст")
+    in_bulk = QuerySet.in_bulk
+
+    def delete_then_fetch(queryset, *args, **kwargs):
+        Post.objects.filter(pk=deleted.pk).delete()
+        return in_bulk(queryset, *args, **kwargs)
+
+    with mock.patch.object(QuerySet, "in_bulk", delete_then_fetch):
+        page = search_posts("поход", timezone.now(), 10)
+    assert [post.pk for post in page] == [kept.pk], (
+        "Убедитесь, что поиск пропускает публикации, удалённые во время "
+        "запроса."
+    )
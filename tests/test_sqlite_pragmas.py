@@ -0,0 +1,30 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_pragma(name):
+    with connection.cursor() as cursor:
+        return cursor.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_connection_is_tuned(settings):
+    pragmas = settings.BLOG_SQLITE_PRAGMAS
+    assert get_pragma("busy_timeout") == pragmas["busy_timeout"], (
+        "Убедитесь, что настройки BLOG_SQLITE_PRAGMAS применяются к "
+        "каждому новому соединению с SQLite."
+    )
+    assert get_pragma("cache_size") == pragmas["cache_size"]
+    assert get_pragma("temp_store") == 2
+
+
+def test_bench_sqlite_command():
+    out = StringIO()
+    call_command(
+        "bench_sqlite", "--seconds", "0.2", "--rows", "100", stdout=out
+    )
+    assert "Tuned:" in out.getvalue()
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+import pytest
+
+from blog.visibility import build_schedule, floor_to_bucket, visibility_now
+
+pytestmark = [pytest.mark.django_db]
+
+BUCKET_START = datetime(2030, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def at(moment):
+    return mock.patch("blog.visibility.timezone.now", return_value=moment)
+
+
+@pytest.fixture
+def delayed_post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=BUCKET_START + timedelta(seconds=30),
+    )
+
+
+def test_floor_to_bucket(settings):
+    settings.BLOG_VISIBILITY_BUCKET = 60
+    moment = BUCKET_START + timedelta(seconds=59, microseconds=1)
+    assert floor_to_bucket(moment) == BUCKET_START
+
+
+def test_clock_is_shared_within_bucket(settings, delayed_post):
+    settings.BLOG_VISIBILITY_BUCKET = 60
+    with at(BUCKET_START + timedelta(seconds=10)):
+        first = visibility_now()
+    with at(BUCKET_START + timedelta(seconds=20)):
+        assert visibility_now() == first == BUCKET_START
+
+
+def test_delayed_post_appears_on_time(settings, client, delayed_post):
+    settings.BLOG_VISIBILITY_BUCKET = 60
+    with at(delayed_post.pub_date - timedelta(seconds=1)):
+        assert delayed_post not in client.get("/").context["page_obj"]
+    with at(delayed_post.pub_date + timedelta(seconds=1)):
+        assert visibility_now() == delayed_post.pub_date
+        assert delayed_post in client.get("/").context["page_obj"], (
+            "Убедитесь, что отложенная публикация появляется в ленте сразу "
+            "после наступления даты публикации, несмотря на кэш."
+        )
+
+
+def test_post_published_during_rebuild_is_scheduled(
+        settings, client, mixer, user, published_category):
+    settings.BLOG_VISIBILITY_BUCKET = 60
+    published = []
+
+    def build_racing_with_publish(now):
+        # Another worker publishes a delayed post after the rebuild read
+        # the database but before the schedule got cached.
+        schedule = build_schedule(now)
+        published.append(mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=BUCKET_START + timedelta(seconds=30),
+        ))
+        return schedule
+
+    with at(BUCKET_START), mock.patch(
+        "blog.visibility.build_schedule", build_racing_with_publish
+    ):
+        visibility_now()
+    with at(BUCKET_START + timedelta(seconds=31)):
+        assert published[0] in client.get("/").context["page_obj"], (
+            "Убедитесь, что публикация, сохранённая во время пересборки "
+            "расписания, появляется в ленте вовремя."
+        )
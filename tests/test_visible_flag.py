@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from blog.views import get_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_visible(posts):
+    return list(
+        Post.objects.filter(pk__in=[post.pk for post in posts])
+        .values_list("is_visible", flat=True)
+    )
+
+
+@pytest.fixture
+def category_posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def test_flag_follows_post(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+    assert get_visible([post]) == [True]
+    post.is_published = False
+    post.save(update_fields=("is_published",))
+    assert get_visible([post]) == [False], (
+        "Убедитесь, что флаг видимости публикации обновляется при снятии "
+        "публикации."
+    )
+
+
+def test_flag_follows_category(
+        monkeypatch, published_category, category_posts):
+    monkeypatch.setattr("blog.visibility.VISIBLE_BATCH_SIZE", 2)
+    published_category.is_published = False
+    published_category.save()
+    assert not any(get_visible(category_posts)), (
+        "Убедитесь, что снятие категории с публикации скрывает все её "
+        "публикации."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert all(get_visible(category_posts))
+    published_category.delete()
+    assert not any(get_visible(category_posts))
+
+
+def test_feed_query_does_not_filter_by_category():
+    where = str(get_posts(select_related=False).query).split("WHERE")[1]
+    assert "blog_category" not in where, (
+        "Убедитесь, что лента фильтруется по флагу видимости публикации "
+        "без соединения с таблицей категорий."
+    )
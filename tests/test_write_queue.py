@@ -0,0 +1,82 @@
+import pytest
+from django.db import OperationalError
+
+from blog.forms import CommentForm
+from blog.models import Comment, Post
+from blog.views import save_new_object
+from blog.writes import (
+    WriteContention, get_write_stats, reset_write_stats, run_write
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(settings):
+    settings.BLOG_WRITE_BACKOFF = 0
+    reset_write_stats()
+
+
+def fail_first(attempts, write):
+    calls = []
+
+    def flaky():
+        calls.append(None)
+        result = write()
+        if len(calls) <= attempts:
+            raise OperationalError("database is locked")
+        return result
+    return flaky
+
+
+def test_locked_write_is_retried(user, post_with_published_location):
+    post = post_with_published_location
+    form = CommentForm({"text": "Текст"})
+    assert form.is_valid()
+    form.instance.author = user
+    form.instance.post = post
+    comment = run_write(fail_first(2, lambda: save_new_object(form)))
+    assert Comment.objects.filter(post=post).count() == 1
+    assert Post.objects.get(pk=post.pk).comment_count == 1, (
+        "Убедитесь, что повторная попытка записи не теряет и не дублирует "
+        "изменения неудавшейся транзакции."
+    )
+    assert comment.pk is not None
+    stats = get_write_stats()
+    assert (stats["writes"], stats["retries"]) == (1, 2)
+
+
+def test_contention_times_out(settings):
+    settings.BLOG_WRITE_RETRIES = 2
+    with pytest.raises(WriteContention):
+        run_write(fail_first(10, lambda: None))
+    assert get_write_stats()["timeouts"] == 1
+
+
+def test_contention_answers_503(
+        monkeypatch, user_client, post_with_published_location):
+    def contention(write):
+        raise WriteContention
+    monkeypatch.setattr("blog.views.run_write", contention)
+    response = user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        {"text": "Текст"}
+    )
+    assert response.status_code == 503, (
+        "Убедитесь, что при перегрузке записи пользователь получает "
+        "ответ 503 вместо ошибки сервера."
+    )
+    assert "Retry-After" in response
+
+
+def test_write_stats_are_logged(settings, caplog):
+    settings.BLOG_WRITE_STATS_INTERVAL = 0
+    with caplog.at_level("INFO", logger="blog.writes"):
+        run_write(fail_first(1, lambda: None))
+    assert any(
+        "1 writes, 1 retries" in record.getMessage()
+        for record in caplog.records
+    ), (
+        "Убедитесь, что счётчики записи периодически пишутся "
+        "в лог `blog.writes`."
+    )